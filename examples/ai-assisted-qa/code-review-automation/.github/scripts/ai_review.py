@@ -7,40 +7,79 @@ AI-powered code review on changed files in a pull request.
 """
 
 import argparse
+import asyncio
 import json
 import os
+import re
 import sys
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
-from typing import List, Dict
+from typing import List, Dict, Optional, Tuple
 
 # Add parent directory to path to import ai_code_reviewer
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
-from ai_code_reviewer import AICodeReviewer, ReviewResult, Severity, format_review_for_github
-
-
+from ai_code_reviewer import (
+    CHUNK_THRESHOLD_LINES, AICodeReviewer, ReviewResult, Severity, format_review_for_github
+)
+from review_cache import ReviewCache, ReviewJSONEncoder, content_hash
+
+# Maximum number of review requests in flight (keeps bursts under RPM limits)
+DEFAULT_MAX_CONCURRENT = 8
+
+# Generated, minified and vendored files are never worth an API call
+SKIP_PATTERNS = [
+    re.compile(r'\.min\.(js|css)$'),
+    re.compile(r'-lock\.(json|yaml)$'),
+    re.compile(r'(^|/)vendor/'),
+    re.compile(r'(^|/)node_modules/'),
+]
+
+# Files above this size are skipped rather than sent to the API
+MAX_FILE_BYTES = 200_000
+
+# Threads used to read changed files concurrently
+MAX_READ_WORKERS = 16
+
+# Small files are packed into one prompt until either limit is reached
+MAX_FILES_PER_PROMPT = 8
+MAX_PROMPT_TOKENS = 6000
+
+# Comment sections in display order: (severity, heading, max comments listed)
+# Low-severity issues follow in a collapsed section
+_ORDER = [
+    (Severity.CRITICAL, "🔴 Critical Issues", None),
+    (Severity.HIGH, "🟠 High Priority Issues", None),
+    (Severity.MEDIUM, "🟡 Medium Priority Issues", 5),  # Limit to avoid huge comments
+]
+
+
+# File extension to language name
+_EXT_MAP = {
+    '.py': 'Python',
+    '.js': 'JavaScript',
+    '.ts': 'TypeScript',
+    '.tsx': 'TypeScript',
+    '.jsx': 'JavaScript',
+    '.java': 'Java',
+    '.go': 'Go',
+    '.rb': 'Ruby',
+    '.php': 'PHP',
+    '.cs': 'C#',
+    '.cpp': 'C++',
+    '.c': 'C',
+    '.rs': 'Rust',
+    '.swift': 'Swift',
+    '.kt': 'Kotlin',
+}
+
+
+@lru_cache(maxsize=1024)
 def detect_language(file_path: str) -> str:
     """Detect programming language from file extension"""
-    extension_map = {
-        '.py': 'Python',
-        '.js': 'JavaScript',
-        '.ts': 'TypeScript',
-        '.tsx': 'TypeScript',
-        '.jsx': 'JavaScript',
-        '.java': 'Java',
-        '.go': 'Go',
-        '.rb': 'Ruby',
-        '.php': 'PHP',
-        '.cs': 'C#',
-        '.cpp': 'C++',
-        '.c': 'C',
-        '.rs': 'Rust',
-        '.swift': 'Swift',
-        '.kt': 'Kotlin',
-    }
-
-    ext = Path(file_path).suffix
-    return extension_map.get(ext, 'Unknown')
+    return _EXT_MAP.get(os.path.splitext(file_path)[1], 'Unknown')
 
 
 def read_file_content(file_path: str) -> str:
@@ -53,66 +92,320 @@ def read_file_content(file_path: str) -> str:
         return ""
 
 
-def review_files(files: List[str]) -> Dict:
+def is_reviewable(file_path: str) -> bool:
     """
-    Review multiple files and aggregate results
+    Check whether a changed file should be reviewed
+
+    Checks run cheapest first: extension and skip patterns need no I/O,
+    then a single stat covers both existence and the size cap.
+    """
+    if detect_language(file_path) == 'Unknown':
+        print(f"⚠️  Skipping {file_path} (unknown language)")
+        return False
+
+    if any(pattern.search(file_path) for pattern in SKIP_PATTERNS):
+        print(f"⚠️  Skipping {file_path} (generated or vendored)")
+        return False
+
+    try:
+        size = os.stat(file_path).st_size
+    except OSError:
+        print(f"⚠️  Skipping {file_path} (not found)")
+        return False
+
+    if size > MAX_FILE_BYTES:
+        print(f"⚠️  Skipping {file_path} (larger than {MAX_FILE_BYTES // 1000} KB)")
+        return False
+
+    return True
+
+
+def read_and_hash(file_path: str) -> Tuple[str, str]:
+    """Read a file and compute its review cache key in one pass"""
+    content = read_file_content(file_path)
+    return content, content_hash(content)
+
+
+def pack_files(
+    prepared: Dict[str, Tuple[str, str]],
+    max_files: int = MAX_FILES_PER_PROMPT,
+    max_tokens: int = MAX_PROMPT_TOKENS
+) -> List[List[str]]:
+    """
+    Greedily group files so each group fits in one review prompt
 
     Args:
-        files: List of file paths to review
+        prepared: Mapping of file path to (content, language), in review order
+        max_files: Maximum number of files per group
+        max_tokens: Estimated prompt token budget per group (~4 chars/token)
 
     Returns:
-        Dictionary with aggregated review results
+        List of groups of file paths; files over the budget get their own
+        group, as do files over CHUNK_THRESHOLD_LINES, so they are reviewed
+        in chunks by review_code_async
     """
-    reviewer = AICodeReviewer()
-
-    all_comments = []
-    total_score = 0
-    num_files = 0
-    critical_count = 0
-    high_count = 0
+    groups = []
+    current = []
+    current_tokens = 0
 
-    for file_path in files:
-        if not os.path.exists(file_path):
-            print(f"⚠️  Skipping {file_path} (not found)")
+    for file_path, (content, _) in prepared.items():
+        if len(content.splitlines()) > CHUNK_THRESHOLD_LINES:
+            groups.append([file_path])
             continue
 
-        language = detect_language(file_path)
-        if language == 'Unknown':
-            print(f"⚠️  Skipping {file_path} (unknown language)")
-            continue
+        tokens = len(content) // 4
 
-        print(f"🔍 Reviewing {file_path} ({language})...")
+        if current and (current_tokens + tokens > max_tokens or len(current) >= max_files):
+            groups.append(current)
+            current = []
+            current_tokens = 0
 
-        content = read_file_content(file_path)
+        current.append(file_path)
+        current_tokens += tokens
+
+    if current:
+        groups.append(current)
+
+    return groups
+
+
+def load_files(files: List[str]) -> Tuple[Dict[str, Tuple[str, str]], Dict[str, str]]:
+    """
+    Load every reviewable file in parallel
+
+    Reads are fanned out over a thread pool so I/O waits overlap and all
+    files are loaded before the first API request is dispatched.
+
+    Args:
+        files: List of changed file paths
+
+    Returns:
+        (content and language per file, content hash per file), both keyed
+        by path in input order
+    """
+    reviewable = [file_path for file_path in files if is_reviewable(file_path)]
+
+    with ThreadPoolExecutor(max_workers=MAX_READ_WORKERS) as executor:
+        loaded = list(executor.map(read_and_hash, reviewable))
+
+    prepared = {}
+    hashes = {}
+    for file_path, (content, digest) in zip(reviewable, loaded):
         if not content:
             continue
+        prepared[file_path] = (content, detect_language(file_path))
+        hashes[file_path] = digest
 
-        try:
-            result = reviewer.review_code(
-                code=content,
-                language=language,
-                context=f"File: {file_path}"
-            )
+    return prepared, hashes
+
+
+def lookup_cache(
+    cache: Optional[ReviewCache],
+    model: str,
+    hashes: Dict[str, str]
+) -> Dict[str, ReviewResult]:
+    """
+    Fetch cached reviews for the given content hashes
+
+    Returns:
+        Cached ReviewResult per file hit
+    """
+    if cache is None:
+        return {}
+
+    cached = cache.get_many(hashes, model)
+    for file_path, result in cached.items():
+        print(f"♻️  Cached {file_path}: Score {result.overall_score}/100, {len(result.comments)} issues")
 
-            # Aggregate results
-            total_score += result.overall_score
-            num_files += 1
+    return cached
 
-            # Prefix comments with file path
-            for comment in result.comments:
-                comment.message = f"**{file_path}:{comment.line_number}** - {comment.message}"
-                all_comments.append(comment)
 
-                if comment.severity == Severity.CRITICAL:
-                    critical_count += 1
-                elif comment.severity == Severity.HIGH:
-                    high_count += 1
+async def review_files(
+    files: List[str],
+    max_concurrent: Optional[int] = None,
+    use_cache: bool = True,
+    model_policy: str = "auto",
+    fail_fast: bool = False
+) -> Dict:
+    """
+    Review multiple files concurrently and aggregate results
+
+    Files whose content was already reviewed are served from ReviewCache.
+    The rest are packed into shared prompts (see pack_files) and each
+    prompt is sent as a separate concurrent request. With fail_fast, the
+    first CRITICAL comment cancels every outstanding request, since the
+    PR fails regardless of what the remaining files contain.
 
+    Args:
+        files: List of file paths to review
+        max_concurrent: Maximum number of in-flight requests
+            (defaults to $AI_REVIEW_MAX_CONCURRENT or DEFAULT_MAX_CONCURRENT)
+        use_cache: Reuse and store results in the on-disk review cache
+        model_policy: "auto" routes by file size, "small"/"large" force a model tier
+        fail_fast: Stop reviewing as soon as a critical issue is found
+
+    Returns:
+        Dictionary with aggregated review results
+    """
+    reviewer = AICodeReviewer(model_policy=model_policy)
+    max_concurrent = max_concurrent or int(
+        os.getenv("AI_REVIEW_MAX_CONCURRENT", DEFAULT_MAX_CONCURRENT)
+    )
+    semaphore = asyncio.Semaphore(max_concurrent)
+    cache = ReviewCache() if use_cache else None
+
+    prepared, hashes = load_files(files)
+    file_results = lookup_cache(cache, reviewer.model_signature, hashes)
+    pending = {file_path: item for file_path, item in prepared.items() if file_path not in file_results}
+    if fail_fast and has_critical(file_results):
+        print("⏹️  Fail-fast: critical issue found in cached results, skipping review")
+        pending = {}
+
+    async def _review_group(group: List[str]) -> Dict[str, ReviewResult]:
+        async with semaphore:
+            for file_path in group:
+                print(f"🔍 Reviewing {file_path} ({pending[file_path][1]})...")
+
+            results = await reviewer.review_files_async(
+                [(file_path, *pending[file_path]) for file_path in group],
+                stop_on_critical=fail_fast
+            )
+
+        for file_path, result in results.items():
             print(f"✅ Reviewed {file_path}: Score {result.overall_score}/100, {len(result.comments)} issues")
+        return results
 
-        except Exception as e:
-            print(f"❌ Error reviewing {file_path}: {e}")
-            continue
+    try:
+        groups = pack_files(pending)
+        tasks = {asyncio.create_task(_review_group(group)): group for group in groups}
+        outstanding = set(tasks)
+
+        while outstanding:
+            done, outstanding = await asyncio.wait(outstanding, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is not None:
+                    for file_path in tasks[task]:
+                        print(f"❌ Error reviewing {file_path}: {task.exception()}")
+                    continue
+
+                outcome = task.result()
+                file_results.update(outcome)
+                if cache is not None:
+                    for file_path, result in outcome.items():
+                        # Results cut short (truncated, unparsable, fail-fast) are reviewed again next run
+                        if result.complete:
+                            cache.put(hashes[file_path], reviewer.model_signature, result)
+
+            if fail_fast and outstanding and has_critical(file_results):
+                print(f"⏹️  Fail-fast: critical issue found, cancelling {len(outstanding)} pending review(s)")
+                for task in outstanding:
+                    task.cancel()
+                await asyncio.gather(*outstanding, return_exceptions=True)
+                break
+    finally:
+        await reviewer.aclose()
+        if cache is not None:
+            cache.close()
+
+    # Report in input order so the output is deterministic
+    return aggregate_results({
+        file_path: file_results[file_path]
+        for file_path in prepared if file_path in file_results
+    })
+
+
+def has_critical(file_results: Dict[str, ReviewResult]) -> bool:
+    """Return True if any result contains a CRITICAL comment"""
+    return any(
+        comment.severity == Severity.CRITICAL
+        for result in file_results.values()
+        for comment in result.comments
+    )
+
+
+def review_files_batch(
+    files: List[str],
+    use_cache: bool = True,
+    model_policy: str = "auto"
+) -> Dict:
+    """
+    Review multiple files through the OpenAI Batch API and aggregate results
+
+    Batch requests cost 50% less and do not count against the synchronous
+    rate limits, but may take minutes to hours to complete. Use this mode
+    for scheduled reviews or very large pull requests.
+
+    Args:
+        files: List of file paths to review
+        use_cache: Reuse and store results in the on-disk review cache
+        model_policy: "auto" routes by file size, "small"/"large" force a model tier
+
+    Returns:
+        Dictionary with aggregated review results
+    """
+    reviewer = AICodeReviewer(model_policy=model_policy)
+    cache = ReviewCache() if use_cache else None
+
+    prepared, hashes = load_files(files)
+    file_results = lookup_cache(cache, reviewer.model_signature, hashes)
+    pending = {file_path: item for file_path, item in prepared.items() if file_path not in file_results}
+
+    try:
+        if pending:
+            print(f"📦 Submitting {len(pending)} file(s) to the OpenAI Batch API...")
+            batch_results = reviewer.review_files_batch(pending)
+
+            for file_path in pending:
+                if file_path not in batch_results:
+                    print(f"❌ Error reviewing {file_path}: no result returned by batch")
+                    continue
+
+                file_results[file_path] = batch_results[file_path]
+                if cache is not None and batch_results[file_path].complete:
+                    cache.put(hashes[file_path], reviewer.model_signature, batch_results[file_path])
+    finally:
+        if cache is not None:
+            cache.close()
+
+    return aggregate_results({
+        file_path: file_results[file_path]
+        for file_path in prepared if file_path in file_results
+    })
+
+
+def aggregate_results(file_results: Dict[str, ReviewResult]) -> Dict:
+    """
+    Aggregate per-file review results
+
+    Args:
+        file_results: Mapping of file path to its ReviewResult
+
+    Returns:
+        Dictionary with aggregated review results
+    """
+    all_comments = []
+    total_score = 0
+    num_files = 0
+    critical_count = 0
+    high_count = 0
+    incomplete_count = 0
+
+    for file_path, result in file_results.items():
+        total_score += result.overall_score
+        num_files += 1
+        if not result.complete:
+            print(f"⚠️  Review of {file_path} is incomplete: {result.summary}")
+            incomplete_count += 1
+
+        # Tag comments with their file; renderers add the location
+        for comment in result.comments:
+            comment.file_path = file_path
+            all_comments.append(comment)
+
+            if comment.severity == Severity.CRITICAL:
+                critical_count += 1
+            elif comment.severity == Severity.HIGH:
+                high_count += 1
 
     if num_files == 0:
         return {
@@ -121,6 +414,7 @@ def review_files(files: List[str]) -> Dict:
             'comments': [],
             'critical_issues': 0,
             'high_issues': 0,
+            'incomplete_reviews': 0,
             'approval_recommended': True,
             'summary': 'No files to review'
         }
@@ -133,15 +427,20 @@ def review_files(files: List[str]) -> Dict:
         'comments': all_comments,
         'critical_issues': critical_count,
         'high_issues': high_count,
-        'approval_recommended': critical_count == 0 and avg_score >= 70,
-        'summary': f'Reviewed {num_files} file(s). Found {len(all_comments)} total issues.'
+        'incomplete_reviews': incomplete_count,
+        # A file whose review didn't complete can't count towards approval
+        'approval_recommended': critical_count == 0 and incomplete_count == 0 and avg_score >= 70,
+        'summary': (
+            f'Reviewed {num_files} file(s). Found {len(all_comments)} total issues.'
+            + (f' {incomplete_count} review(s) incomplete.' if incomplete_count else '')
+        )
     }
 
 
 def generate_review_comment(results: Dict) -> str:
     """Generate markdown comment for GitHub PR"""
 
-    output = "## 🤖 AI Code Review Results\n\n"
+    parts: List[str] = ["## 🤖 AI Code Review Results\n\n"]
 
     # Score badge
     score = results['overall_score']
@@ -152,72 +451,63 @@ def generate_review_comment(results: Dict) -> str:
     else:
         badge = "🔴"
 
-    output += f"{badge} **Overall Score:** {score}/100\n\n"
+    parts.append(f"{badge} **Overall Score:** {score}/100\n\n")
 
     # Recommendation
     if results['approval_recommended']:
-        output += "✅ **Recommendation:** Approved with suggestions\n\n"
+        parts.append("✅ **Recommendation:** Approved with suggestions\n\n")
     else:
-        output += "❌ **Recommendation:** Changes requested\n\n"
+        parts.append("❌ **Recommendation:** Changes requested\n\n")
 
     # Summary
-    output += f"**Files Reviewed:** {results['total_files']}\n"
-    output += f"**Total Issues:** {len(results['comments'])}\n"
+    parts.append(f"**Files Reviewed:** {results['total_files']}\n")
+    parts.append(f"**Total Issues:** {len(results['comments'])}\n")
 
     if results['critical_issues'] > 0:
-        output += f"**🔴 Critical Issues:** {results['critical_issues']}\n"
+        parts.append(f"**🔴 Critical Issues:** {results['critical_issues']}\n")
 
     if results['high_issues'] > 0:
-        output += f"**🟠 High Priority Issues:** {results['high_issues']}\n"
-
-    output += "\n---\n\n"
+        parts.append(f"**🟠 High Priority Issues:** {results['high_issues']}\n")
 
-    # Group comments by severity
-    if results['comments']:
-        critical = [c for c in results['comments'] if c.severity == Severity.CRITICAL]
-        high = [c for c in results['comments'] if c.severity == Severity.HIGH]
-        medium = [c for c in results['comments'] if c.severity == Severity.MEDIUM]
-        low = [c for c in results['comments'] if c.severity == Severity.LOW]
-
-        if critical:
-            output += "### 🔴 Critical Issues\n\n"
-            for comment in critical:
-                output += f"- {comment.message}\n"
-                if comment.suggestion:
-                    output += f"  💡 *{comment.suggestion}*\n"
-                output += "\n"
+    if results['incomplete_reviews'] > 0:
+        parts.append(f"**⚠️ Incomplete Reviews:** {results['incomplete_reviews']} (not approved, re-reviewed next run)\n")
 
-        if high:
-            output += "### 🟠 High Priority Issues\n\n"
-            for comment in high:
-                output += f"- {comment.message}\n"
-                if comment.suggestion:
-                    output += f"  💡 *{comment.suggestion}*\n"
-                output += "\n"
+    parts.append("\n---\n\n")
 
-        if medium:
-            output += "### 🟡 Medium Priority Issues\n\n"
-            for comment in medium[:5]:  # Limit to 5 to avoid huge comments
-                output += f"- {comment.message}\n"
+    # Group comments by severity in a single pass
+    if results['comments']:
+        buckets = defaultdict(list)
+        for comment in results['comments']:
+            buckets[comment.severity].append(comment)
+
+        for severity, heading, limit in _ORDER:
+            comments = buckets[severity]
+            if not comments:
+                continue
+
+            parts.append(f"### {heading}\n\n")
+            for comment in comments[:limit]:
+                parts.append(f"- **{comment.file_path}:{comment.line_number}** - {comment.message}\n")
                 if comment.suggestion:
-                    output += f"  💡 *{comment.suggestion}*\n"
-                output += "\n"
+                    parts.append(f"  💡 *{comment.suggestion}*\n")
+                parts.append("\n")
 
-            if len(medium) > 5:
-                output += f"*...and {len(medium) - 5} more medium priority issues*\n\n"
+            if limit is not None and len(comments) > limit:
+                parts.append(f"*...and {len(comments) - limit} more {severity.value} priority issues*\n\n")
 
+        low = buckets[Severity.LOW]
         if low:
-            output += f"### 🔵 Low Priority Issues ({len(low)})\n\n"
-            output += "<details>\n<summary>Click to expand</summary>\n\n"
+            parts.append(f"### 🔵 Low Priority Issues ({len(low)})\n\n")
+            parts.append("<details>\n<summary>Click to expand</summary>\n\n")
             for comment in low:
-                output += f"- {comment.message}\n"
-            output += "\n</details>\n\n"
+                parts.append(f"- **{comment.file_path}:{comment.line_number}** - {comment.message}\n")
+            parts.append("\n</details>\n\n")
 
-    output += "---\n\n"
-    output += "*🤖 Generated by AI Code Reviewer powered by GPT-4*\n"
-    output += "*This review is automated and should be used as guidance. Human review is still recommended.*"
+    parts.append("---\n\n")
+    parts.append("*🤖 Generated by AI Code Reviewer powered by GPT-4*\n")
+    parts.append("*This review is automated and should be used as guidance. Human review is still recommended.*")
 
-    return output
+    return "".join(parts)
 
 
 def main():
@@ -225,6 +515,24 @@ def main():
     parser.add_argument('--files', required=True, help='Comma-separated list of files to review')
     parser.add_argument('--pr-number', required=True, help='Pull request number')
     parser.add_argument('--repo', required=True, help='Repository (owner/repo)')
+    parser.add_argument(
+        '--mode',
+        choices=['sync', 'batch'],
+        default='sync',
+        help='sync: concurrent interactive requests; batch: OpenAI Batch API (50%% cheaper, slower)'
+    )
+    parser.add_argument('--no-cache', action='store_true', help='Ignore and do not update the review cache')
+    parser.add_argument(
+        '--model-policy',
+        choices=['auto', 'small', 'large'],
+        default='auto',
+        help='auto: cheaper model for small files, top model for large files; small/large: force a tier'
+    )
+    parser.add_argument(
+        '--fail-fast',
+        action='store_true',
+        help='Stop reviewing and cancel pending requests at the first critical issue (sync mode only)'
+    )
     args = parser.parse_args()
 
     # Parse files
@@ -238,21 +546,17 @@ def main():
     print(f"📁 Files to review: {len(files)}")
 
     # Run review
-    results = review_files(files)
-
-    # Convert ReviewComment objects to dicts for JSON serialization
-    results_json = {
-        'overall_score': results['overall_score'],
-        'total_files': results['total_files'],
-        'critical_issues': results['critical_issues'],
-        'high_issues': results['high_issues'],
-        'approval_recommended': results['approval_recommended'],
-        'summary': results['summary']
-    }
+    use_cache = not args.no_cache
+    if args.mode == 'batch':
+        results = review_files_batch(files, use_cache=use_cache, model_policy=args.model_policy)
+    else:
+        results = asyncio.run(review_files(
+            files, use_cache=use_cache, model_policy=args.model_policy, fail_fast=args.fail_fast
+        ))
 
-    # Save results
+    # Save full results, including every comment
     with open('/tmp/review_result.json', 'w') as f:
-        json.dump(results_json, f, indent=2)
+        json.dump(results, f, cls=ReviewJSONEncoder, indent=2)
 
     # Generate and save comment
     comment = generate_review_comment(results)
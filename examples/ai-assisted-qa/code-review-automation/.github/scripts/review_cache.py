@@ -0,0 +1,149 @@
+"""
+On-disk cache for AI review results
+
+Reviews are keyed by the SHA-256 of the file content, the model and the
+prompt version, so files that reappear in a PR unchanged (rebases, merges,
+follow-up pushes) are not sent to the API again. Persist the cache file
+between workflow runs (e.g. with actions/cache) to benefit in CI.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+import time
+from dataclasses import asdict, is_dataclass
+from enum import Enum
+from pathlib import Path
+from typing import Dict, Optional
+
+# Add parent directory to path to import ai_code_reviewer
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from ai_code_reviewer import (
+    CACHE_PROMPT_VERSION,
+    Category,
+    ReviewComment,
+    ReviewResult,
+    Severity,
+)
+
+DEFAULT_CACHE_PATH = ".github/.ai_review_cache.sqlite"
+
+
+def content_hash(content: str) -> str:
+    """Return the cache key for a file's content"""
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+class ReviewJSONEncoder(json.JSONEncoder):
+    """JSON encoder for review dataclasses, storing enums by value"""
+
+    def default(self, o):
+        if isinstance(o, Enum):
+            return o.value
+        if is_dataclass(o) and not isinstance(o, type):
+            return asdict(o)
+        return super().default(o)
+
+
+def result_to_json(result: ReviewResult) -> str:
+    """Serialize a ReviewResult"""
+    return json.dumps(result, cls=ReviewJSONEncoder)
+
+
+def result_from_json(payload: str) -> ReviewResult:
+    """Deserialize a ReviewResult produced by result_to_json"""
+    data = json.loads(payload)
+    comments = [
+        ReviewComment(**{
+            **comment,
+            "severity": Severity(comment["severity"]),
+            "category": Category(comment["category"])
+        })
+        for comment in data.pop("comments")
+    ]
+    return ReviewResult(comments=comments, **data)
+
+
+class ReviewCache:
+    """
+    SQLite-backed cache of ReviewResults
+
+    Example usage:
+        cache = ReviewCache()
+        key = content_hash(code)
+        result = cache.get(key, reviewer.model_signature)
+        if result is None:
+            result = reviewer.review_code(code, "Python")
+            cache.put(key, reviewer.model_signature, result)
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.getenv("AI_REVIEW_CACHE_PATH", DEFAULT_CACHE_PATH)
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+
+        self.conn = sqlite3.connect(self.path)
+        self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS review_cache (
+                hash TEXT NOT NULL,
+                model TEXT NOT NULL,
+                prompt_ver INTEGER NOT NULL,
+                result_json BLOB NOT NULL,
+                created_at INTEGER NOT NULL,
+                PRIMARY KEY (hash, model, prompt_ver)
+            )
+            """
+        )
+        self.conn.commit()
+
+    def get(self, key: str, model: str) -> Optional[ReviewResult]:
+        """Return the cached result for a content hash, if any"""
+        row = self.conn.execute(
+            "SELECT result_json FROM review_cache WHERE hash = ? AND model = ? AND prompt_ver = ?",
+            (key, model, CACHE_PROMPT_VERSION)
+        ).fetchone()
+
+        if row is None:
+            return None
+
+        try:
+            return result_from_json(row[0])
+        except (ValueError, KeyError, TypeError):
+            # Stale or corrupt entry: treat as a miss
+            return None
+
+    def get_many(self, keys: Dict[str, str], model: str) -> Dict[str, ReviewResult]:
+        """
+        Look up several entries at once
+
+        Args:
+            keys: Mapping of file path to content hash
+            model: Model signature the results were produced with
+
+        Returns:
+            Mapping of file path to cached ReviewResult for every hit
+        """
+        hits = {}
+        for file_path, key in keys.items():
+            result = self.get(key, model)
+            if result is not None:
+                hits[file_path] = result
+        return hits
+
+    def put(self, key: str, model: str, result: ReviewResult):
+        """Store a review result; incomplete results are never stored"""
+        if not result.complete:
+            return
+
+        self.conn.execute(
+            "INSERT OR REPLACE INTO review_cache VALUES (?, ?, ?, ?, ?)",
+            (key, model, CACHE_PROMPT_VERSION, result_to_json(result), int(time.time()))
+        )
+        self.conn.commit()
+
+    def close(self):
+        """Close the database connection"""
+        self.conn.close()
@@ -13,10 +13,17 @@ Features:
 - Style and convention checking
 """
 
+import asyncio
+import json
 import os
-from typing import List, Dict, Optional, Tuple
+import re
+import time
+from contextlib import aclosing
+from typing import AsyncIterator, Dict, List, Optional, Tuple, Union
+from collections import defaultdict
 from dataclasses import dataclass
 from enum import Enum
+import httpx
 import openai
 
 
@@ -49,6 +56,7 @@ class ReviewComment:
     message: str
     suggestion: Optional[str] = None
     code_snippet: Optional[str] = None
+    file_path: Optional[str] = None  # Set when aggregating multi-file reviews
 
 
 @dataclass
@@ -58,6 +66,236 @@ class ReviewResult:
     comments: List[ReviewComment]
     summary: str
     approval_recommended: bool
+    complete: bool = True  # False if the review was cut short or its response couldn't be parsed
+
+
+# Value lookups for model output, so unknown labels fall back without raising
+_SEVERITY_MAP = {severity.value: severity for severity in Severity}
+_CATEGORY_MAP = {category.value: category for category in Category}
+
+# Severity sections of the GitHub comment, in display order
+_SEVERITY_ORDER = [
+    (Severity.CRITICAL, "🔴 Critical"),
+    (Severity.HIGH, "🟠 High"),
+    (Severity.MEDIUM, "🟡 Medium"),
+    (Severity.LOW, "🔵 Low"),
+]
+
+
+# Account limits used when OPENAI_RPM / OPENAI_TPM are not set
+DEFAULT_REQUESTS_PER_MINUTE = 500
+DEFAULT_TOKENS_PER_MINUTE = 90_000
+
+# Shared connection pool for async requests (HTTP/2 multiplexes them over few TLS sessions)
+HTTP_MAX_CONNECTIONS = 64
+HTTP_MAX_KEEPALIVE_CONNECTIONS = 32
+HTTP_TIMEOUT = 60.0
+HTTP_CONNECT_TIMEOUT = 5.0
+
+# Seconds between status checks while waiting for a Batch API job
+BATCH_POLL_INTERVAL = 30.0
+BATCH_TERMINAL_STATUSES = ("completed", "failed", "expired", "cancelled")
+
+# Completion budget cap for a single-file review. A multi-file prompt gets
+# the sum of its files' budgets, capped only at the models' output limit.
+MAX_COMPLETION_TOKENS = 2000
+MAX_MULTI_FILE_COMPLETION_TOKENS = 16_384
+
+# Files longer than this are reviewed as overlapping chunks and merged
+CHUNK_THRESHOLD_LINES = 800
+CHUNK_WINDOW_LINES = 400
+CHUNK_OVERLAP_LINES = 40
+
+# Model routing: small files go to the cheaper model unless the review is
+# security-focused (see AICodeReviewer._select_model)
+DEFAULT_SMALL_MODEL = "gpt-4o-mini"
+DEFAULT_LARGE_MODEL = "gpt-4o"
+SMALL_MODEL_MAX_LOC = 300
+MODEL_POLICIES = ("auto", "small", "large")
+
+# Completion budget scales with file size: base + per line of code
+COMPLETION_TOKENS_BASE = 256
+COMPLETION_TOKENS_PER_LINE = 4
+
+# Bump whenever SYSTEM_PROMPT or the prompt builders change so cached
+# review results produced by older prompts are not reused
+CACHE_PROMPT_VERSION = 3
+
+# Static instructions sent as the system message on every request. Keeping
+# this byte-identical across calls (no interpolation) lets OpenAI's automatic
+# prompt caching reuse it; only code and context go in the user message.
+# Caching applies once the shared prefix exceeds 1024 tokens, so team-specific
+# review guidelines belong here rather than in per-call context.
+SYSTEM_PROMPT = """You are an expert code reviewer with deep knowledge of software engineering best practices, security, and performance optimization.
+
+You will receive code to review, preceded by its language and optional context. If a "Focus specifically on" line is present, concentrate on those categories.
+
+Analyze the code and provide:
+
+1. **Issues Found**: For each issue, provide:
+   - Line number (null for general issues)
+   - Severity: critical/high/medium/low/info
+   - Category: bug/security/performance/maintainability/style/best_practice/documentation
+   - Description of the issue
+   - Specific suggestion for improvement
+   - Code example of fix (null if not applicable)
+
+2. **Focus Areas**:
+   - **Bugs**: Logic errors, edge cases, null/undefined handling
+   - **Security**: SQL injection, XSS, authentication/authorization, data exposure
+   - **Performance**: Inefficient algorithms, unnecessary operations, memory leaks
+   - **Maintainability**: Code complexity, duplication, naming, structure
+   - **Style**: Formatting, conventions, consistency
+   - **Best Practices**: Design patterns, SOLID principles, language idioms
+   - **Documentation**: Missing docstrings, unclear comments, outdated docs
+
+3. **Overall Assessment**: Quality score (0-100) and brief summary
+
+4. **Recommendation**: Should this code be approved, approved with changes, or rejected?
+
+Respond with JSON matching the provided schema.
+
+When several files are provided under "### FILE N:" headers, review each file independently and return one entry per file in "files", with "file" set to N. Line numbers are relative to that file.
+"""
+
+_ISSUE_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "line": {"type": ["integer", "null"]},
+        "severity": {"type": "string", "enum": [severity.value for severity in Severity]},
+        "category": {"type": "string", "enum": [category.value for category in Category]},
+        "message": {"type": "string"},
+        "suggestion": {"type": ["string", "null"]},
+        "code": {"type": ["string", "null"]}
+    },
+    "required": ["line", "severity", "category", "message", "suggestion", "code"],
+    "additionalProperties": False
+}
+
+# Issues come first so streamed comments can be parsed (and acted on)
+# before the model writes its overall assessment
+_REVIEW_PROPERTIES = {
+    "issues": {"type": "array", "items": _ISSUE_SCHEMA},
+    "score": {"type": "integer"},
+    "summary": {"type": "string"},
+    "recommendation": {"type": "string", "enum": ["approve", "approve_with_changes", "reject"]}
+}
+
+REVIEW_SCHEMA = {
+    "type": "object",
+    "properties": _REVIEW_PROPERTIES,
+    "required": list(_REVIEW_PROPERTIES),
+    "additionalProperties": False
+}
+
+MULTI_FILE_REVIEW_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "files": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {"file": {"type": "integer"}, **_REVIEW_PROPERTIES},
+                "required": ["file", *_REVIEW_PROPERTIES],
+                "additionalProperties": False
+            }
+        }
+    },
+    "required": ["files"],
+    "additionalProperties": False
+}
+
+# Structured outputs: the API guarantees responses match these schemas
+REVIEW_RESPONSE_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {"name": "code_review", "strict": True, "schema": REVIEW_SCHEMA}
+}
+MULTI_FILE_RESPONSE_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {"name": "multi_file_code_review", "strict": True, "schema": MULTI_FILE_REVIEW_SCHEMA}
+}
+
+# Start of the issues array in a (possibly partial) review response
+_ISSUES_START_RE = re.compile(r'"issues"\s*:\s*\[')
+_JSON_DECODER = json.JSONDecoder()
+
+# Retry policy for rate-limit and timeout errors
+MAX_RETRY_ATTEMPTS = 5
+RETRY_BASE_DELAY = 1.0
+RETRY_MAX_DELAY = 30.0
+
+
+class RateLimiter:
+    """
+    Async token bucket limiting both requests and tokens per minute
+
+    Both buckets refill continuously, mirroring the capacity tracking in
+    OpenAI's api_request_parallel_processor.py. Callers wait until their
+    request fits in both buckets, so concurrent reviews run at a steady
+    rate instead of bursting into 429 responses.
+
+    Example usage:
+        limiter = RateLimiter(max_requests_per_minute=500, max_tokens_per_minute=90_000)
+        await limiter.acquire(requests=1, tokens=3000)
+    """
+
+    def __init__(self, max_requests_per_minute: float, max_tokens_per_minute: float):
+        self.max_requests_per_minute = max_requests_per_minute
+        self.max_tokens_per_minute = max_tokens_per_minute
+        self.available_requests = max_requests_per_minute
+        self.available_tokens = max_tokens_per_minute
+        self._last_refill = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    @classmethod
+    def from_env(cls) -> "RateLimiter":
+        """Build a limiter from OPENAI_RPM / OPENAI_TPM environment variables"""
+        return cls(
+            max_requests_per_minute=float(os.getenv("OPENAI_RPM", DEFAULT_REQUESTS_PER_MINUTE)),
+            max_tokens_per_minute=float(os.getenv("OPENAI_TPM", DEFAULT_TOKENS_PER_MINUTE))
+        )
+
+    def _refill(self):
+        """Add capacity proportional to the time elapsed since the last refill"""
+        now = time.monotonic()
+        elapsed = now - self._last_refill
+        self._last_refill = now
+
+        self.available_requests = min(
+            self.max_requests_per_minute,
+            self.available_requests + self.max_requests_per_minute * elapsed / 60
+        )
+        self.available_tokens = min(
+            self.max_tokens_per_minute,
+            self.available_tokens + self.max_tokens_per_minute * elapsed / 60
+        )
+
+    async def acquire(self, requests: int = 1, tokens: int = 0):
+        """
+        Wait until the given number of requests and tokens is available
+
+        Args:
+            requests: Number of requests to consume
+            tokens: Estimated tokens (prompt + completion) to consume
+        """
+        # A single oversized request must not wait forever
+        tokens = min(tokens, self.max_tokens_per_minute)
+
+        # Holding the lock while sleeping serves waiters in FIFO order
+        async with self._lock:
+            while True:
+                self._refill()
+
+                if self.available_requests >= requests and self.available_tokens >= tokens:
+                    self.available_requests -= requests
+                    self.available_tokens -= tokens
+                    return
+
+                wait_seconds = max(
+                    (requests - self.available_requests) * 60 / self.max_requests_per_minute,
+                    (tokens - self.available_tokens) * 60 / self.max_tokens_per_minute
+                )
+                await asyncio.sleep(wait_seconds)
 
 
 class AICodeReviewer:
@@ -73,9 +311,61 @@ class AICodeReviewer:
         )
     """
 
-    def __init__(self, api_key: Optional[str] = None):
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        model_small: str = DEFAULT_SMALL_MODEL,
+        model_large: str = DEFAULT_LARGE_MODEL,
+        model_policy: str = "auto"
+    ):
+        if model_policy not in MODEL_POLICIES:
+            raise ValueError(f"model_policy must be one of {MODEL_POLICIES}, got '{model_policy}'")
+
         self.api_key = api_key or os.getenv("OPENAI_API_KEY")
+        self.model_small = model_small
+        self.model_large = model_large
+        self.model_policy = model_policy
         self.client = openai.OpenAI(api_key=self.api_key)
+        self.rate_limiter = rate_limiter or RateLimiter.from_env()
+        self._http: Optional[httpx.AsyncClient] = None
+        self._async_client: Optional[openai.AsyncOpenAI] = None
+
+    @property
+    def async_client(self) -> openai.AsyncOpenAI:
+        """
+        Async API client backed by a shared, pooled HTTP client
+
+        Built on first use so sync-only callers never open a pool, and so
+        the connections belong to the event loop that uses them. Call
+        aclose() when done.
+        """
+        if self._async_client is None:
+            limits = httpx.Limits(
+                max_connections=HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=HTTP_MAX_KEEPALIVE_CONNECTIONS
+            )
+            timeout = httpx.Timeout(HTTP_TIMEOUT, connect=HTTP_CONNECT_TIMEOUT)
+            try:
+                self._http = httpx.AsyncClient(http2=True, limits=limits, timeout=timeout)
+            except ImportError:
+                # HTTP/2 needs the h2 package (pip install httpx[http2])
+                self._http = httpx.AsyncClient(limits=limits, timeout=timeout)
+
+            # Retries are handled by _create_with_retry so they pass through the limiter
+            self._async_client = openai.AsyncOpenAI(
+                api_key=self.api_key,
+                max_retries=0,
+                http_client=self._http
+            )
+        return self._async_client
+
+    async def aclose(self):
+        """Close the shared HTTP connection pool"""
+        if self._http is not None:
+            await self._http.aclose()
+        self._http = None
+        self._async_client = None
 
     def review_code(
         self,
@@ -96,25 +386,459 @@ class AICodeReviewer:
         Returns:
             ReviewResult with comments and recommendations
         """
-        prompt = self._build_review_prompt(code, language, context, focus_areas)
+        chunks = self._chunk_code(code)
+        if len(chunks) == 1:
+            return self._review_whole(code, language, context, focus_areas)
+
+        results = [
+            self._review_whole(text, language, self._chunk_context(context, start, text), focus_areas)
+            for start, text in chunks
+        ]
+        return self._merge_chunk_results(chunks, results)
+
+    def _review_whole(
+        self,
+        code: str,
+        language: str,
+        context: Optional[str],
+        focus_areas: Optional[List[Category]]
+    ) -> ReviewResult:
+        """Review code in a single streamed request"""
 
         response = self.client.chat.completions.create(
-            model="gpt-4-turbo-preview",
-            messages=[
+            **self._build_request_params(code, language, context, focus_areas),
+            stream=True
+        )
+
+        state = self._new_parse_state()
+        for chunk in response:
+            if not chunk.choices:
+                continue
+            if chunk.choices[0].delta.content:
+                self._feed(chunk.choices[0].delta.content, state)
+            if chunk.choices[0].finish_reason:
+                state["finish_reason"] = chunk.choices[0].finish_reason
+
+        return self._finish_parse(state)
+
+    async def review_code_async(
+        self,
+        code: str,
+        language: str,
+        context: Optional[str] = None,
+        focus_areas: Optional[List[Category]] = None,
+        stop_on_critical: bool = False
+    ) -> ReviewResult:
+        """
+        Asynchronous variant of review_code
+
+        Lets callers review several files concurrently (e.g. with
+        asyncio.gather) instead of waiting on each API round-trip in turn.
+        Files longer than CHUNK_THRESHOLD_LINES are split into overlapping
+        chunks that are reviewed concurrently and merged.
+
+        Args:
+            code: Code to review (can be full file or diff)
+            language: Programming language
+            context: Additional context about the code
+            focus_areas: Specific categories to focus on
+            stop_on_critical: Stop generating as soon as a CRITICAL comment
+                is streamed and return the partial result
+
+        Returns:
+            ReviewResult with comments and recommendations
+        """
+        chunks = self._chunk_code(code)
+        if len(chunks) == 1:
+            return await self._review_whole_async(code, language, context, focus_areas, stop_on_critical)
+
+        results = await asyncio.gather(*(
+            self._review_whole_async(
+                text, language, self._chunk_context(context, start, text), focus_areas, stop_on_critical
+            )
+            for start, text in chunks
+        ))
+        return self._merge_chunk_results(chunks, list(results))
+
+    async def _review_whole_async(
+        self,
+        code: str,
+        language: str,
+        context: Optional[str],
+        focus_areas: Optional[List[Category]],
+        stop_on_critical: bool = False
+    ) -> ReviewResult:
+        """Review code in a single streamed request"""
+
+        comments = []
+        async with aclosing(self.review_code_stream(code, language, context, focus_areas)) as stream:
+            async for item in stream:
+                if isinstance(item, ReviewResult):
+                    return item
+
+                comments.append(item)
+                if stop_on_critical and item.severity == Severity.CRITICAL:
+                    # Closing the stream here stops generation of the rest
+                    return self._incomplete_result(comments, "Review stopped at the first critical issue")
+
+    def _chunk_code(
+        self,
+        code: str,
+        window: int = CHUNK_WINDOW_LINES,
+        overlap: int = CHUNK_OVERLAP_LINES
+    ) -> List[Tuple[int, str]]:
+        """
+        Split oversized code into overlapping line windows
+
+        Returns:
+            List of (start_line_offset, chunk_text); a single chunk holding
+            the whole code when it is under CHUNK_THRESHOLD_LINES
+        """
+        lines = code.splitlines(keepends=True)
+        if len(lines) <= CHUNK_THRESHOLD_LINES:
+            return [(0, code)]
+
+        chunks = []
+        step = window - overlap
+        for start in range(0, len(lines), step):
+            chunks.append((start, "".join(lines[start:start + window])))
+            if start + window >= len(lines):
+                break
+
+        return chunks
+
+    def _chunk_context(self, context: Optional[str], start: int, text: str) -> str:
+        """Describe which part of the file a chunk covers"""
+
+        end = start + len(text.splitlines())
+        excerpt = (
+            f"Excerpt: lines {start + 1}-{end} of a larger file. "
+            "Report line numbers relative to this excerpt."
+        )
+        return f"{context} {excerpt}" if context else excerpt
+
+    def _merge_chunk_results(
+        self,
+        chunks: List[Tuple[int, str]],
+        results: List[ReviewResult]
+    ) -> ReviewResult:
+        """
+        Reduce per-chunk reviews into one ReviewResult
+
+        Line numbers are shifted back to file positions, issues reported
+        twice in overlapping regions are dropped, and the score is the
+        average weighted by chunk length.
+        """
+        comments = []
+        seen = set()
+        for (start, _), result in zip(chunks, results):
+            for comment in result.comments:
+                if comment.line_number:
+                    comment.line_number += start
+
+                key = (comment.line_number, hash(comment.message))
+                if key in seen:
+                    continue
+                seen.add(key)
+                comments.append(comment)
+
+        weights = [len(text.splitlines()) for _, text in chunks]
+        score = round(
+            sum(result.overall_score * weight for result, weight in zip(results, weights)) / sum(weights)
+        )
+
+        return ReviewResult(
+            overall_score=score,
+            comments=comments,
+            summary=" ".join(dict.fromkeys(result.summary for result in results)),
+            approval_recommended=all(result.approval_recommended for result in results),
+            complete=all(result.complete for result in results)
+        )
+
+    async def review_code_stream(
+        self,
+        code: str,
+        language: str,
+        context: Optional[str] = None,
+        focus_areas: Optional[List[Category]] = None
+    ) -> AsyncIterator[Union[ReviewComment, ReviewResult]]:
+        """
+        Stream a review, yielding each comment as soon as it is complete
+
+        Comments are parsed while the model is still generating, so callers
+        can render or act on them early. The last item yielded is the full
+        ReviewResult. Breaking out of the loop closes the HTTP stream, which
+        stops generation (and billing) for the remaining output.
+
+        Example usage:
+            async for item in reviewer.review_code_stream(code, "Python"):
+                if isinstance(item, ReviewComment):
+                    print(item.message)
+
+        Args:
+            code: Code to review (can be full file or diff)
+            language: Programming language
+            context: Additional context about the code
+            focus_areas: Specific categories to focus on
+
+        Yields:
+            ReviewComment objects, followed by the final ReviewResult
+        """
+        params = self._build_request_params(code, language, context, focus_areas)
+        state = self._new_parse_state()
+
+        async with aclosing(self._stream_completion(params, state)) as deltas:
+            async for delta in deltas:
+                for comment in self._feed(delta, state):
+                    yield comment
+
+        yield self._finish_parse(state)
+
+    async def review_files_async(
+        self,
+        files: List[Tuple[str, str, str]],
+        stop_on_critical: bool = False
+    ) -> Dict[str, ReviewResult]:
+        """
+        Review several files with a single API call
+
+        The files are packed into one prompt with stable delimiters, which
+        amortizes the instructions, network round-trip and request overhead
+        across all of them. Best suited to groups of small files.
+
+        Args:
+            files: List of (file_path, code, language) tuples
+            stop_on_critical: Passed to review_code_async for single-file
+                groups (a combined answer is only parsed once complete)
+
+        Returns:
+            Mapping of file path to ReviewResult, in input order (files
+            missing from the combined answer are re-reviewed individually)
+        """
+        if len(files) == 1:
+            file_path, code, language = files[0]
+            result = await self.review_code_async(
+                code, language, context=f"File: {file_path}", stop_on_critical=stop_on_critical
+            )
+            return {file_path: result}
+
+        prompt = self._build_multi_file_prompt(files)
+        line_counts = [code.count("\n") for _, code, _ in files]
+        model = self._select_model(max(line_counts), None)
+        max_tokens = min(
+            MAX_MULTI_FILE_COMPLETION_TOKENS,
+            sum(self._completion_budget(loc) for loc in line_counts)
+        )
+        params = self._chat_params(prompt, model, max_tokens, MULTI_FILE_RESPONSE_FORMAT)
+        state = {}
+        async with aclosing(self._stream_completion(params, state)) as stream:
+            deltas = [delta async for delta in stream]
+
+        # A cut-off answer isn't valid JSON; every file then falls back
+        sections = {}
+        if state.get("finish_reason") != "length":
+            sections = self._split_multi_file_response("".join(deltas))
+
+        results = {}
+        missing = []
+        for index, (file_path, code, language) in enumerate(files, 1):
+            if index in sections:
+                section = sections[index]
+                comments = [self._create_comment(issue) for issue in section.get("issues", [])]
+                results[file_path] = self._build_result(section, comments)
+            else:
+                missing.append((file_path, code, language))
+
+        # Fall back to individual reviews, run concurrently, for files the model skipped
+        fallbacks = await asyncio.gather(*(
+            self.review_code_async(code, language, context=f"File: {file_path}")
+            for file_path, code, language in missing
+        ))
+        results.update(zip((file_path for file_path, _, _ in missing), fallbacks))
+
+        return {file_path: results[file_path] for file_path, _, _ in files}
+
+    async def _stream_completion(self, params: Dict, state: Optional[Dict] = None) -> AsyncIterator[str]:
+        """
+        Yield response text deltas from a streaming chat completion
+
+        The completion's finish_reason is recorded in state["finish_reason"]
+        if a state dict is given.
+        """
+
+        response = await self._create_with_retry({**params, "stream": True})
+        try:
+            async for chunk in response:
+                if not chunk.choices:
+                    continue
+                if chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+                if state is not None and chunk.choices[0].finish_reason:
+                    state["finish_reason"] = chunk.choices[0].finish_reason
+        finally:
+            await response.close()
+
+    async def _create_with_retry(self, params: Dict):
+        """
+        Call the chat completions API through the rate limiter
+
+        Rate-limit and timeout errors are retried with exponential backoff.
+        """
+        estimated_tokens = self._estimate_tokens(params)
+
+        for attempt in range(MAX_RETRY_ATTEMPTS):
+            await self.rate_limiter.acquire(requests=1, tokens=estimated_tokens)
+
+            try:
+                return await self.async_client.chat.completions.create(**params)
+            except (openai.RateLimitError, openai.APITimeoutError):
+                if attempt == MAX_RETRY_ATTEMPTS - 1:
+                    raise
+                await asyncio.sleep(min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** attempt))
+
+    @staticmethod
+    def _estimate_tokens(params: Dict) -> int:
+        """Estimate prompt + completion tokens (~4 characters per token)"""
+        prompt_chars = sum(len(message["content"]) for message in params["messages"])
+        return prompt_chars // 4 + params["max_tokens"]
+
+    def review_files_batch(
+        self,
+        files: Dict[str, Tuple[str, str]],
+        poll_interval: float = BATCH_POLL_INTERVAL
+    ) -> Dict[str, ReviewResult]:
+        """
+        Review many files with a single OpenAI Batch API job
+
+        Each file becomes one line of a JSONL upload using the same request
+        body as review_code. The batch is polled until it finishes, which can
+        take up to the 24h completion window, in exchange for 50% lower cost
+        and no synchronous rate limits.
+
+        Args:
+            files: Mapping of file path to (code, language)
+            poll_interval: Seconds between batch status checks
+
+        Returns:
+            Mapping of file path to ReviewResult (failed requests are omitted)
+        """
+        lines = []
+        for file_path, (code, language) in files.items():
+            lines.append(json.dumps({
+                "custom_id": file_path,
+                "method": "POST",
+                "url": "/v1/chat/completions",
+                "body": self._build_request_params(code, language, f"File: {file_path}", None)
+            }))
+
+        batch_file = self.client.files.create(
+            file=("review_batch.jsonl", "\n".join(lines).encode("utf-8")),
+            purpose="batch"
+        )
+        batch = self.client.batches.create(
+            input_file_id=batch_file.id,
+            endpoint="/v1/chat/completions",
+            completion_window="24h"
+        )
+
+        while batch.status not in BATCH_TERMINAL_STATUSES:
+            time.sleep(poll_interval)
+            batch = self.client.batches.retrieve(batch.id)
+
+        if batch.status != "completed":
+            raise RuntimeError(f"Batch {batch.id} ended with status '{batch.status}'")
+
+        results = {}
+        if not batch.output_file_id:
+            return results
+
+        output = self.client.files.content(batch.output_file_id).text
+        for line in output.splitlines():
+            if not line.strip():
+                continue
+
+            record = json.loads(line)
+            response = record.get("response") or {}
+            if record.get("error") or response.get("status_code") != 200:
+                continue
+
+            choice = response["body"]["choices"][0]
+            results[record["custom_id"]] = self._parse_review_response(
+                choice["message"]["content"], choice.get("finish_reason")
+            )
+
+        return results
+
+    def _build_request_params(
+        self,
+        code: str,
+        language: str,
+        context: Optional[str],
+        focus_areas: Optional[List[Category]]
+    ) -> Dict:
+        """Build chat completion parameters shared by sync and async reviews"""
+
+        prompt = self._build_review_prompt(code, language, context, focus_areas)
+        loc = code.count("\n")
+
+        return self._chat_params(
+            prompt,
+            self._select_model(loc, focus_areas),
+            self._completion_budget(loc)
+        )
+
+    @property
+    def model_signature(self) -> str:
+        """Identify the model configuration (e.g. for cache keys)"""
+        return f"{self.model_policy}:{self.model_small}:{self.model_large}"
+
+    def _select_model(self, loc: int, focus_areas: Optional[List[Category]]) -> str:
+        """
+        Pick the model for a review
+
+        Small files are reviewed just as well by the cheaper model, so only
+        large files and security scans go to the top model under "auto".
+        """
+        if self.model_policy == "small":
+            return self.model_small
+
+        if self.model_policy == "large":
+            return self.model_large
+
+        if loc < SMALL_MODEL_MAX_LOC and Category.SECURITY not in (focus_areas or []):
+            return self.model_small
+
+        return self.model_large
+
+    def _completion_budget(self, loc: int) -> int:
+        """Cap max_tokens in proportion to the amount of code under review"""
+        return min(MAX_COMPLETION_TOKENS, COMPLETION_TOKENS_BASE + loc * COMPLETION_TOKENS_PER_LINE)
+
+    def _chat_params(
+        self,
+        prompt: str,
+        model: str,
+        max_tokens: int,
+        response_format: Dict = REVIEW_RESPONSE_FORMAT
+    ) -> Dict:
+        """Wrap a user prompt in the chat completion request body"""
+
+        return {
+            "model": model,
+            "messages": [
                 {
                     "role": "system",
-                    "content": "You are an expert code reviewer with deep knowledge of software engineering best practices, security, and performance optimization."
+                    "content": SYSTEM_PROMPT
                 },
                 {
                     "role": "user",
                     "content": prompt
                 }
             ],
-            temperature=0.2,
-            max_tokens=2000
-        )
-
-        return self._parse_review_response(response.choices[0].message.content)
+            "temperature": 0.2,
+            "max_tokens": max_tokens,
+            "response_format": response_format
+        }
 
     def _build_review_prompt(
         self,
@@ -123,163 +847,164 @@ class AICodeReviewer:
         context: Optional[str],
         focus_areas: Optional[List[Category]]
     ) -> str:
-        """Build prompt for code review"""
+        """Build the per-call user message for a single-file review"""
+
+        prompt = f"Language: {language}\n"
 
-        prompt = f"""You are conducting a comprehensive code review for {language} code.
+        if context:
+            prompt += f"Context: {context}\n"
 
-{"Context: " + context if context else ""}
+        if focus_areas:
+            prompt += "Focus specifically on: " + ", ".join(area.value for area in focus_areas) + "\n"
 
-Code to review:
+        prompt += f"""
 ```{language.lower()}
 {code}
 ```
+"""
 
-Please analyze the code and provide:
-
-1. **Overall Assessment**: Brief summary and quality score (0-100)
-
-2. **Issues Found**: For each issue, provide:
-   - Line number (if applicable)
-   - Severity: critical/high/medium/low/info
-   - Category: bug/security/performance/maintainability/style/best_practice/documentation
-   - Description of the issue
-   - Specific suggestion for improvement
-   - Code example of fix (if applicable)
-
-{"Focus specifically on: " + ", ".join([area.value for area in focus_areas]) if focus_areas else ""}
-
-3. **Focus Areas**:"""
-
-        if not focus_areas or Category.BUG in (focus_areas or []):
-            prompt += "\n   - **Bugs**: Logic errors, edge cases, null/undefined handling"
-
-        if not focus_areas or Category.SECURITY in (focus_areas or []):
-            prompt += "\n   - **Security**: SQL injection, XSS, authentication/authorization, data exposure"
+        return prompt
 
-        if not focus_areas or Category.PERFORMANCE in (focus_areas or []):
-            prompt += "\n   - **Performance**: Inefficient algorithms, unnecessary operations, memory leaks"
+    def _build_multi_file_prompt(self, files: List[Tuple[str, str, str]]) -> str:
+        """Build the per-call user message reviewing several (path, code, language) files"""
 
-        if not focus_areas or Category.MAINTAINABILITY in (focus_areas or []):
-            prompt += "\n   - **Maintainability**: Code complexity, duplication, naming, structure"
+        prompt = f"Files to review: {len(files)}\n\n"
 
-        if not focus_areas or Category.STYLE in (focus_areas or []):
-            prompt += "\n   - **Style**: Formatting, conventions, consistency"
+        for index, (file_path, code, language) in enumerate(files, 1):
+            prompt += f"""### FILE {index}: {file_path} ({language})
+```{language.lower()}
+{code}
+```
 
-        if not focus_areas or Category.BEST_PRACTICE in (focus_areas or []):
-            prompt += "\n   - **Best Practices**: Design patterns, SOLID principles, language idioms"
+"""
 
-        if not focus_areas or Category.DOCUMENTATION in (focus_areas or []):
-            prompt += "\n   - **Documentation**: Missing docstrings, unclear comments, outdated docs"
+        return prompt
 
-        prompt += """
+    def _split_multi_file_response(self, response: str) -> Dict[int, Dict]:
+        """Split a multi-file response into per-file review objects keyed by file number"""
 
-4. **Recommendation**: Should this code be approved, approved with changes, or rejected?
+        try:
+            data = json.loads(response)
+        except json.JSONDecodeError:
+            # Truncated output: every file falls back to an individual review
+            return {}
 
-Format your response as:
+        return {entry["file"]: entry for entry in data.get("files", []) if "file" in entry}
 
-SCORE: [0-100]
+    def _parse_review_response(self, response: str, finish_reason: Optional[str] = None) -> ReviewResult:
+        """Parse AI response into structured ReviewResult"""
 
-ISSUES:
-[For each issue:]
-LINE: [number or "general"]
-SEVERITY: [critical/high/medium/low/info]
-CATEGORY: [category]
-MESSAGE: [description]
-SUGGESTION: [how to fix]
-CODE: [example fix if applicable]
----
+        state = self._new_parse_state()
+        state["finish_reason"] = finish_reason
+        self._feed(response, state)
+        return self._finish_parse(state)
 
-SUMMARY: [brief overall summary]
+    def _new_parse_state(self) -> Dict:
+        """Create the mutable state used by the incremental response parser"""
 
-RECOMMENDATION: [approve/approve_with_changes/reject]
-"""
+        return {
+            "buffer": "",
+            "pos": None,  # Next unread position inside the issues array
+            "issues_done": False,
+            "comments": [],
+            "finish_reason": None  # Set by the caller once the completion ends
+        }
 
-        return prompt
+    def _feed(self, delta: str, state: Dict) -> List[ReviewComment]:
+        """
+        Feed a chunk of (possibly partial) JSON response to the parser
 
-    def _parse_review_response(self, response: str) -> ReviewResult:
-        """Parse AI response into structured ReviewResult"""
+        Each issue object is decoded as soon as it is complete, so comments
+        are available while the model is still generating.
 
-        # Simple parsing logic (in production, use more robust parsing)
-        lines = response.split('\n')
+        Returns:
+            The ReviewComments completed by this chunk
+        """
+        state["buffer"] += delta
+        buffer = state["buffer"]
+        completed = []
 
-        score = 70  # Default
-        comments = []
-        summary = ""
-        recommendation = "approve_with_changes"
+        if state["pos"] is None:
+            match = _ISSUES_START_RE.search(buffer)
+            if not match:
+                return completed
+            state["pos"] = match.end()
 
-        current_comment = {}
+        pos = state["pos"]
+        while not state["issues_done"]:
+            while pos < len(buffer) and buffer[pos] in " \t\r\n,":
+                pos += 1
 
-        for line in lines:
-            line = line.strip()
+            if pos >= len(buffer):
+                break
 
-            if line.startswith("SCORE:"):
-                try:
-                    score = int(line.split(":")[1].strip())
-                except:
-                    pass
+            if buffer[pos] == "]":
+                state["issues_done"] = True
+                break
 
-            elif line.startswith("LINE:"):
-                if current_comment:
-                    comments.append(self._create_comment(current_comment))
-                current_comment = {"line": line.split(":")[1].strip()}
+            try:
+                issue, pos = _JSON_DECODER.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                break  # Issue object not complete yet
 
-            elif line.startswith("SEVERITY:"):
-                current_comment["severity"] = line.split(":")[1].strip()
+            comment = self._create_comment(issue)
+            state["comments"].append(comment)
+            completed.append(comment)
 
-            elif line.startswith("CATEGORY:"):
-                current_comment["category"] = line.split(":")[1].strip()
+        state["pos"] = pos
+        return completed
 
-            elif line.startswith("MESSAGE:"):
-                current_comment["message"] = line.split(":", 1)[1].strip()
+    def _finish_parse(self, state: Dict) -> ReviewResult:
+        """
+        Build the final ReviewResult once the response is complete
 
-            elif line.startswith("SUGGESTION:"):
-                current_comment["suggestion"] = line.split(":", 1)[1].strip()
+        A response cut off at max_tokens or that isn't valid JSON gives an
+        incomplete, not-approved result with the issues recovered so far,
+        never a default approval.
+        """
+        if state["finish_reason"] == "length":
+            return self._incomplete_result(state["comments"], "Review incomplete: response was cut off")
 
-            elif line.startswith("CODE:"):
-                current_comment["code"] = line.split(":", 1)[1].strip()
+        try:
+            data = json.loads(state["buffer"])
+        except json.JSONDecodeError:
+            return self._incomplete_result(state["comments"], "Review incomplete: response was not valid JSON")
 
-            elif line.startswith("SUMMARY:"):
-                summary = line.split(":", 1)[1].strip()
+        return self._build_result(data, state["comments"])
 
-            elif line.startswith("RECOMMENDATION:"):
-                recommendation = line.split(":")[1].strip().lower()
+    @staticmethod
+    def _incomplete_result(comments: List[ReviewComment], summary: str) -> ReviewResult:
+        """Result for a review that didn't run to completion; never approved or cached"""
 
-            elif line == "---" and current_comment:
-                comments.append(self._create_comment(current_comment))
-                current_comment = {}
+        return ReviewResult(
+            overall_score=0,
+            comments=comments,
+            summary=summary,
+            approval_recommended=False,
+            complete=False
+        )
 
-        # Add last comment if exists
-        if current_comment:
-            comments.append(self._create_comment(current_comment))
+    def _build_result(self, data: Dict, comments: List[ReviewComment]) -> ReviewResult:
+        """Build a ReviewResult from a decoded review object"""
 
+        recommendation = data.get("recommendation", "approve_with_changes")
         approval = recommendation in ["approve", "approve_with_changes"]
 
         return ReviewResult(
-            overall_score=score,
+            overall_score=data.get("score", 70),
             comments=comments,
-            summary=summary or "Code review completed",
+            summary=data.get("summary") or "Code review completed",
             approval_recommended=approval
         )
 
     def _create_comment(self, data: Dict) -> ReviewComment:
         """Create ReviewComment from parsed data"""
 
-        try:
-            line_num = int(data.get("line", "0"))
-        except:
-            line_num = 0
-
-        severity = Severity.MEDIUM
-        try:
-            severity = Severity(data.get("severity", "medium").lower())
-        except:
-            pass
+        line = str(data.get("line") or "0").strip()
+        line_num = int(line) if line.isdigit() else 0
 
-        category = Category.BUG
-        try:
-            category = Category(data.get("category", "bug").lower())
-        except:
-            pass
+        severity = _SEVERITY_MAP.get(str(data.get("severity") or "").strip().lower(), Severity.MEDIUM)
+        category = _CATEGORY_MAP.get(str(data.get("category") or "").strip().lower(), Category.BUG)
 
         return ReviewComment(
             line_number=line_num,
@@ -362,45 +1087,44 @@ def format_review_for_github(result: ReviewResult) -> str:
     Returns:
         Markdown-formatted comment
     """
-    output = f"## 🤖 AI Code Review\n\n"
-    output += f"**Overall Score:** {result.overall_score}/100\n\n"
+    parts: List[str] = ["## 🤖 AI Code Review\n\n"]
+    parts.append(f"**Overall Score:** {result.overall_score}/100\n\n")
 
     if result.approval_recommended:
-        output += "✅ **Recommendation:** Approved with suggestions\n\n"
+        parts.append("✅ **Recommendation:** Approved with suggestions\n\n")
     else:
-        output += "❌ **Recommendation:** Changes requested\n\n"
+        parts.append("❌ **Recommendation:** Changes requested\n\n")
 
-    output += f"**Summary:** {result.summary}\n\n"
+    parts.append(f"**Summary:** {result.summary}\n\n")
 
     if result.comments:
-        output += "---\n\n### Issues Found\n\n"
-
-        # Group by severity
-        critical = [c for c in result.comments if c.severity == Severity.CRITICAL]
-        high = [c for c in result.comments if c.severity == Severity.HIGH]
-        medium = [c for c in result.comments if c.severity == Severity.MEDIUM]
-        low = [c for c in result.comments if c.severity == Severity.LOW]
-
-        for severity_name, comments in [
-            ("🔴 Critical", critical),
-            ("🟠 High", high),
-            ("🟡 Medium", medium),
-            ("🔵 Low", low)
-        ]:
+        parts.append("---\n\n### Issues Found\n\n")
+
+        # Group by severity in a single pass
+        buckets = defaultdict(list)
+        for comment in result.comments:
+            buckets[comment.severity].append(comment)
+
+        for severity, severity_name in _SEVERITY_ORDER:
+            comments = buckets[severity]
             if comments:
-                output += f"\n#### {severity_name}\n\n"
+                parts.append(f"\n#### {severity_name}\n\n")
                 for comment in comments:
-                    output += f"**Line {comment.line_number}** - {comment.category.value.title()}\n"
-                    output += f"> {comment.message}\n\n"
+                    location = (
+                        f"{comment.file_path}:{comment.line_number}" if comment.file_path
+                        else f"Line {comment.line_number}"
+                    )
+                    parts.append(f"**{location}** - {comment.category.value.title()}\n")
+                    parts.append(f"> {comment.message}\n\n")
                     if comment.suggestion:
-                        output += f"💡 **Suggestion:** {comment.suggestion}\n\n"
+                        parts.append(f"💡 **Suggestion:** {comment.suggestion}\n\n")
                     if comment.code_snippet:
-                        output += f"```\n{comment.code_snippet}\n```\n\n"
+                        parts.append(f"```\n{comment.code_snippet}\n```\n\n")
 
-    output += "\n---\n"
-    output += "*Generated by AI Code Reviewer*"
+    parts.append("\n---\n")
+    parts.append("*Generated by AI Code Reviewer*")
 
-    return output
+    return "".join(parts)
 
 
 # Example usage
@@ -8,17 +8,25 @@ Provides HTTP endpoints for:
 - Health checks
 
 Run with: uvicorn api:app --reload
+Ingestion runs on a Celery worker: celery -A tasks worker --loglevel=info
 """
 
-from fastapi import FastAPI, HTTPException, BackgroundTasks
+from celery.result import AsyncResult
+from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from pydantic import BaseModel, Field
-from typing import Optional, List, Dict
+from typing import Annotated, Optional, List, Dict
+import asyncio
 import uuid
 from datetime import datetime
 import logging
+import orjson
+import redis.asyncio as aioredis
+from redis.exceptions import RedisError
 
-from rag_pipeline import RAGPipeline, RAGConfig
+from rag_pipeline import DocumentProcessor, RAGPipeline, RAGConfig
+from tasks import REDIS_URL, celery_app, ingest_task, vectorstore_version_key
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -28,7 +36,8 @@ logger = logging.getLogger(__name__)
 app = FastAPI(
     title="QA Knowledge Base API",
     description="RAG-powered assistant for SDLC, testing, and CI/CD questions",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse
 )
 
 # CORS middleware for frontend integration
@@ -43,6 +52,17 @@ app.add_middleware(
 # Global RAG pipeline instance
 rag_pipeline: Optional[RAGPipeline] = None
 
+# Reads the vector store version published by the ingestion worker
+redis_client: Optional[aioredis.Redis] = None
+
+# Vector store version this process has loaded; see refresh_vectorstore
+loaded_vectorstore_version = 0
+reload_lock = asyncio.Lock()
+
+# Seconds between checks for a new vector store version
+VECTORSTORE_POLL_INTERVAL = 5.0
+vectorstore_poller: Optional[asyncio.Task] = None
+
 
 # Request/Response Models
 class QueryRequest(BaseModel):
@@ -94,6 +114,30 @@ class QueryResponse(BaseModel):
         }
 
 
+class BatchQueryRequest(BaseModel):
+    """Request model for batch queries"""
+    questions: List[Annotated[str, Field(min_length=1, max_length=1000)]] = Field(
+        ..., min_length=1, max_length=100
+    )
+    include_sources: bool = True
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "questions": [
+                    "What is test-driven development?",
+                    "What are DORA metrics?"
+                ],
+                "include_sources": True
+            }
+        }
+
+
+class BatchQueryResponse(BaseModel):
+    """Response model for batch queries"""
+    results: List[QueryResponse]
+
+
 class SessionRequest(BaseModel):
     """Request to create a new session"""
     user_id: Optional[str] = None
@@ -118,16 +162,105 @@ class HealthResponse(BaseModel):
     timestamp: str
 
 
+def build_query_response(result: Dict, include_sources: bool, timestamp: str) -> Dict:
+    """
+    Shape a pipeline result like QueryResponse
+
+    The result comes from our own pipeline, so query endpoints return this
+    dict directly as an ORJSONResponse instead of validating it against the
+    response model again.
+    """
+    return {
+        "answer": result['answer'],
+        "sources": result['sources'] if include_sources else [],
+        "confidence": result['confidence'],
+        "session_id": result.get('session_id'),
+        "timestamp": timestamp
+    }
+
+
+async def get_vectorstore_version() -> int:
+    """Vector store version last published by the ingestion worker (0 before any ingestion)"""
+    version = await redis_client.get(vectorstore_version_key(rag_pipeline.config.collection_name))
+    return int(version or 0)
+
+
+async def refresh_vectorstore():
+    """
+    Reload the vector store if the ingestion worker has updated it
+
+    Run every VECTORSTORE_POLL_INTERVAL seconds by poll_vectorstore, so
+    ingested documents become visible without anyone polling /ingest. If
+    Redis is unreachable, the currently loaded vector store keeps being
+    served.
+    """
+    global loaded_vectorstore_version
+
+    try:
+        version = await get_vectorstore_version()
+    except RedisError as e:
+        logger.warning(f"Could not read vector store version: {e}")
+        return
+
+    if version == loaded_vectorstore_version:
+        return
+
+    async with reload_lock:
+        # A concurrent caller may have reloaded while this one waited
+        if version != loaded_vectorstore_version:
+            await asyncio.to_thread(rag_pipeline.reload)
+            loaded_vectorstore_version = version
+            logger.info(f"Reloaded vector store at version {version}")
+
+
+async def poll_vectorstore():
+    """Refresh the vector store in the background for the lifetime of the app"""
+    while True:
+        await asyncio.sleep(VECTORSTORE_POLL_INTERVAL)
+        try:
+            await refresh_vectorstore()
+        except Exception as e:
+            # Keep polling; the next interval retries the reload
+            logger.error(f"Vector store reload failed: {e}")
+
+
+async def warm_up(pipeline: RAGPipeline):
+    """
+    Open the OpenAI connections and load the tokenizer before the first request
+
+    Failures are logged and otherwise ignored; the first query then pays
+    the cost instead.
+    """
+    steps = {
+        "embeddings": pipeline.vector_store.embeddings.aembed_query("warmup"),
+        "llm": pipeline.llm.ainvoke("ping", max_tokens=1),
+        # Loads and caches tiktoken's encoding tables
+        "tokenizer": asyncio.to_thread(DocumentProcessor, pipeline.config),
+    }
+
+    results = await asyncio.gather(*steps.values(), return_exceptions=True)
+    for name, result in zip(steps, results):
+        if isinstance(result, Exception):
+            logger.warning(f"Warm-up of {name} failed: {result}")
+
+
 # Startup/Shutdown Events
 @app.on_event("startup")
 async def startup_event():
     """Initialize RAG pipeline on startup"""
-    global rag_pipeline
+    global rag_pipeline, redis_client, loaded_vectorstore_version, vectorstore_poller
 
     try:
         logger.info("Initializing RAG pipeline...")
         config = RAGConfig()
         rag_pipeline = RAGPipeline(config)
+        redis_client = aioredis.Redis.from_url(REDIS_URL)
+
+        # Read before loading, so an ingestion finishing meanwhile still triggers a reload
+        try:
+            loaded_vectorstore_version = await get_vectorstore_version()
+        except RedisError as e:
+            logger.warning(f"Could not read vector store version: {e}")
 
         # Try to load existing vector store
         try:
@@ -137,6 +270,11 @@ async def startup_event():
             logger.warning(f"Could not load vector store: {e}")
             logger.info("Vector store will be created on first ingestion")
 
+        await warm_up(rag_pipeline)
+        logger.info("RAG pipeline warmed up")
+
+        vectorstore_poller = asyncio.create_task(poll_vectorstore())
+
     except Exception as e:
         logger.error(f"Failed to initialize RAG pipeline: {e}")
         raise
@@ -146,6 +284,12 @@ async def startup_event():
 async def shutdown_event():
     """Cleanup on shutdown"""
     logger.info("Shutting down RAG API")
+    if vectorstore_poller:
+        vectorstore_poller.cancel()
+    if rag_pipeline:
+        await rag_pipeline.aclose()
+    if redis_client:
+        await redis_client.aclose()
 
 
 # API Endpoints
@@ -197,20 +341,13 @@ async def query_knowledge_base(request: QueryRequest):
     try:
         logger.info(f"Processing query: {request.question[:50]}...")
 
-        result = rag_pipeline.query(
+        result = await rag_pipeline.aquery(
             question=request.question,
             session_id=request.session_id
         )
 
-        # Convert to response model
-        sources = [Source(**source) for source in result['sources']] if request.include_sources else []
-
-        return QueryResponse(
-            answer=result['answer'],
-            sources=sources,
-            confidence=result['confidence'],
-            session_id=result.get('session_id'),
-            timestamp=datetime.utcnow().isoformat()
+        return ORJSONResponse(
+            build_query_response(result, request.include_sources, datetime.utcnow().isoformat())
         )
 
     except Exception as e:
@@ -218,6 +355,96 @@ async def query_knowledge_base(request: QueryRequest):
         raise HTTPException(status_code=500, detail=f"Query processing failed: {str(e)}")
 
 
+@app.post("/query/batch", response_model=BatchQueryResponse)
+async def batch_query_knowledge_base(request: BatchQueryRequest):
+    """
+    Answer up to 100 independent questions in one request
+
+    The questions are embedded in a single OpenAI call and answered
+    concurrently. Batch questions are not part of any session.
+
+    Args:
+        request: BatchQueryRequest with the list of questions
+
+    Returns:
+        BatchQueryResponse with one QueryResponse per question, in order
+
+    Raises:
+        HTTPException: If RAG pipeline not initialized or query fails
+    """
+    if not rag_pipeline:
+        raise HTTPException(status_code=503, detail="RAG pipeline not initialized")
+
+    if not rag_pipeline.vector_store.vectorstore:
+        raise HTTPException(
+            status_code=503,
+            detail="Vector store not ready. Please ingest documents first."
+        )
+
+    try:
+        logger.info(f"Processing batch of {len(request.questions)} queries")
+
+        results = await rag_pipeline.abatch_query(request.questions)
+        timestamp = datetime.utcnow().isoformat()
+
+        return ORJSONResponse({"results": [
+            build_query_response(result, request.include_sources, timestamp)
+            for result in results
+        ]})
+
+    except Exception as e:
+        logger.error(f"Batch query failed: {e}")
+        raise HTTPException(status_code=500, detail=f"Batch query processing failed: {str(e)}")
+
+
+@app.post("/query/stream")
+async def stream_knowledge_base(request: QueryRequest):
+    """
+    Query the knowledge base, streaming the answer as Server-Sent Events
+
+    Each token is sent as a `data: {"token": ...}` event as soon as the LLM
+    produces it. A final event carries the sources, confidence, session_id
+    and timestamp.
+
+    Args:
+        request: QueryRequest with question and optional session_id
+
+    Returns:
+        StreamingResponse with media type text/event-stream
+
+    Raises:
+        HTTPException: If RAG pipeline not initialized
+    """
+    if not rag_pipeline:
+        raise HTTPException(status_code=503, detail="RAG pipeline not initialized")
+
+    if not rag_pipeline.vector_store.vectorstore:
+        raise HTTPException(
+            status_code=503,
+            detail="Vector store not ready. Please ingest documents first."
+        )
+
+    logger.info(f"Streaming query: {request.question[:50]}...")
+
+    async def event_stream():
+        try:
+            async for event in rag_pipeline.astream_query(
+                question=request.question,
+                session_id=request.session_id
+            ):
+                if 'token' not in event:
+                    if not request.include_sources:
+                        event['sources'] = []
+                    event['timestamp'] = datetime.utcnow().isoformat()
+                yield b"data: " + orjson.dumps(event) + b"\n\n"
+        except Exception as e:
+            # The response has already started, so report the error in-band
+            logger.error(f"Streaming query failed: {e}")
+            yield b"data: " + orjson.dumps({'error': f'Query processing failed: {str(e)}'}) + b"\n\n"
+
+    return StreamingResponse(event_stream(), media_type="text/event-stream")
+
+
 @app.post("/session", response_model=SessionResponse)
 async def create_session(request: SessionRequest):
     """
@@ -260,38 +487,67 @@ async def clear_session(session_id: str):
 
 
 @app.post("/ingest")
-async def ingest_documents(request: IngestRequest, background_tasks: BackgroundTasks):
+async def ingest_documents(request: IngestRequest):
     """
-    Ingest documents into the knowledge base (background task)
+    Queue documents for ingestion into the knowledge base
+
+    The ingestion runs on a Celery worker; poll /ingest/{task_id} for its
+    progress.
 
     Args:
         request: IngestRequest with docs_directory path
-        background_tasks: FastAPI background tasks
 
     Returns:
-        Acceptance message (processing happens in background)
+        Acceptance message with the ingestion task_id
     """
     if not rag_pipeline:
         raise HTTPException(status_code=503, detail="RAG pipeline not initialized")
 
-    def ingest_task():
-        """Background task for document ingestion"""
-        try:
-            logger.info(f"Starting document ingestion from {request.docs_directory}")
-            rag_pipeline.initialize_from_documents(request.docs_directory)
-            logger.info("Document ingestion completed")
-        except Exception as e:
-            logger.error(f"Document ingestion failed: {e}")
-
-    background_tasks.add_task(ingest_task)
+    task = ingest_task.delay(request.docs_directory)
+    logger.info(f"Queued document ingestion from {request.docs_directory} as {task.id}")
 
     return {
-        "message": "Document ingestion started",
+        "message": "Document ingestion queued",
+        "task_id": task.id,
         "docs_directory": request.docs_directory,
         "timestamp": datetime.utcnow().isoformat()
     }
 
 
+@app.get("/ingest/{task_id}")
+async def get_ingest_status(task_id: str):
+    """
+    Get the state of an ingestion task
+
+    Once the task has completed, the vector store is reloaded if this
+    process hasn't picked up the new documents yet.
+
+    Args:
+        task_id: Task identifier returned by /ingest
+
+    Returns:
+        Dictionary with the task state and, when finished, its result
+    """
+    if not rag_pipeline:
+        raise HTTPException(status_code=503, detail="RAG pipeline not initialized")
+
+    result = AsyncResult(task_id, app=celery_app)
+    status = {
+        "task_id": task_id,
+        "state": result.state,
+        "timestamp": datetime.utcnow().isoformat()
+    }
+
+    if result.successful():
+        status["result"] = result.result
+        if result.result.get("status") == "completed":
+            await refresh_vectorstore()
+    elif result.failed():
+        status["error"] = str(result.result)
+
+    return status
+
+
 @app.get("/stats")
 async def get_stats():
     """
@@ -300,12 +556,14 @@ async def get_stats():
     Returns:
         Dictionary with knowledge base statistics
     """
-    if not rag_pipeline or not rag_pipeline.vector_store.vectorstore:
+    if not rag_pipeline:
+        raise HTTPException(status_code=503, detail="RAG pipeline not initialized")
+
+    if not rag_pipeline.vector_store.vectorstore:
         raise HTTPException(status_code=503, detail="Vector store not ready")
 
     try:
-        collection = rag_pipeline.vector_store.vectorstore._collection
-        count = collection.count()
+        count = rag_pipeline.vector_store.count()
 
         return {
             "total_chunks": count,
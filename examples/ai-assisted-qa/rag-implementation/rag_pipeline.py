@@ -15,20 +15,51 @@ Tech Stack:
 - FastAPI for REST API (see api.py)
 """
 
+import asyncio
+import hashlib
 import os
-from typing import List, Dict, Optional, Tuple
-from dataclasses import dataclass
+import sqlite3
+import threading
+import weakref
+from contextlib import closing, contextmanager
+from pathlib import Path
+from typing import AsyncIterator, List, Dict, Optional, Tuple
+from dataclasses import dataclass, field
+import aiofiles
 import chromadb
-from chromadb.config import Settings
-from langchain.embeddings import OpenAIEmbeddings
+import httpx
+import numpy as np
+from cachetools import TTLCache
+import openai
+from langchain_openai import ChatOpenAI, OpenAIEmbeddings
 from langchain.vectorstores import Chroma
-from langchain.text_splitter import RecursiveCharacterTextSplitter
-from langchain.chat_models import ChatOpenAI
-from langchain.chains import ConversationalRetrievalChain
-from langchain.memory import ConversationBufferMemory
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+from langchain.callbacks import AsyncIteratorCallbackHandler
+from langchain.chains import LLMChain
+from langchain.chains.conversational_retrieval.prompts import CONDENSE_QUESTION_PROMPT
+from langchain.chains.question_answering import load_qa_chain
+from langchain.memory import ConversationBufferWindowMemory
 from langchain.docstore.document import Document
+from langchain.schema import get_buffer_string
 import tiktoken
 
+# Texts per embeddings request (the API accepts up to 2048 inputs per call)
+EMBEDDING_BATCH_SIZE = 512
+
+# Answer returned without calling the LLM when no chunk passes similarity_threshold
+NO_ANSWER = "I don't know - I couldn't find anything relevant in the knowledge base."
+
+# HNSW index settings, applied when the collection is first created
+COLLECTION_METADATA = {"hnsw:space": "cosine", "hnsw:M": 32, "hnsw:construction_ef": 200}
+
+# Documents read concurrently during ingestion
+MAX_CONCURRENT_READS = 64
+
+# Connection pool shared by the async embedding and chat calls
+HTTP_MAX_CONNECTIONS = 200
+HTTP_MAX_KEEPALIVE_CONNECTIONS = 100
+HTTP_TIMEOUT = 60.0
+
 
 @dataclass
 class RAGConfig:
@@ -36,12 +67,17 @@ class RAGConfig:
     # OpenAI Configuration
     openai_api_key: str = os.getenv("OPENAI_API_KEY", "")
     embedding_model: str = "text-embedding-3-small"
+    embedding_dimensions: int = 512  # text-embedding-3 models can be shortened (default 1536)
     llm_model: str = "gpt-4-turbo-preview"
     temperature: float = 0.1
 
     # Vector Database Configuration
-    chroma_persist_directory: str = "./chroma_db"
+    # Read when the config is created, so the worker and tests can set it after import
+    chroma_persist_directory: str = field(
+        default_factory=lambda: os.getenv("CHROMA_PERSIST_DIRECTORY", "./chroma_db")
+    )
     collection_name: str = "qa_knowledge_base"
+    embedding_cache_path: str = "./embedding_cache.sqlite"
 
     # Chunking Configuration
     chunk_size: int = 1000
@@ -49,11 +85,327 @@ class RAGConfig:
 
     # Retrieval Configuration
     top_k_results: int = 3
-    similarity_threshold: float = 0.7
+    similarity_threshold: float = 0.3  # Min cosine similarity (text-embedding-3 scores run lower than ada-002)
+    use_mmr: bool = False  # Re-rank candidates for diversity with maximal marginal relevance
+    mmr_lambda: float = 0.5  # 1.0 ranks purely by relevance, 0.0 purely by diversity
+    mmr_fetch_k: int = 20  # Candidates retrieved before MMR picks top_k_results
 
     # Conversation Configuration
     max_history_length: int = 5
     max_tokens: int = 8000
+    max_sessions: int = 10_000
+    session_ttl_seconds: int = 3600  # Idle sessions are forgotten after this
+
+    # Semantic Answer Cache Configuration
+    semantic_cache_size: int = 1000
+    semantic_cache_threshold: float = 0.95   # Min cosine similarity between questions
+    semantic_cache_min_overlap: float = 0.7  # Min Jaccard overlap of retrieved chunks
+
+    # Batch Query Configuration
+    max_concurrent_answers: int = 8  # LLM calls in flight per pipeline for batch queries, to stay under rate limits
+
+
+async def _read_texts(paths: List[Path]) -> List[Optional[str]]:
+    """
+    Read documents concurrently, at most MAX_CONCURRENT_READS at a time
+
+    Args:
+        paths: Files to read
+
+    Returns:
+        One content string per path, or None where the file cannot be loaded
+    """
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_READS)
+
+    async def read(path: Path) -> Optional[str]:
+        async with semaphore:
+            try:
+                async with aiofiles.open(path, 'r', encoding='utf-8') as f:
+                    return await f.read()
+            except Exception as e:
+                print(f"Error loading {path}: {e}")
+                return None
+
+    return await asyncio.gather(*(read(path) for path in paths))
+
+
+def build_async_http_client() -> httpx.AsyncClient:
+    """Pooled HTTP client for the async OpenAI calls, over HTTP/2 when available"""
+    limits = httpx.Limits(
+        max_connections=HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections=HTTP_MAX_KEEPALIVE_CONNECTIONS
+    )
+    try:
+        return httpx.AsyncClient(http2=True, limits=limits, timeout=HTTP_TIMEOUT)
+    except ImportError:
+        # HTTP/2 needs the h2 package (pip install httpx[http2])
+        return httpx.AsyncClient(limits=limits, timeout=HTTP_TIMEOUT)
+
+
+def chunk_id(metadata: Dict) -> str:
+    """
+    Stable identifier for a chunk, so re-ingesting a file replaces its chunks
+
+    Keyed on the absolute file path, since relative sources from different
+    docs directories can coincide.
+    """
+    return f"{metadata['file_path']}#{metadata['chunk_index']}"
+
+
+def embedding_key(model: str, text: str) -> str:
+    """Cache key for the embedding of a text under a given model"""
+    return hashlib.sha256(f"{model}|{text}".encode("utf-8")).hexdigest()
+
+
+def quantize_int8(vectors: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Quantize float vectors to int8 with one scale per vector
+
+    Args:
+        vectors: Array of shape (n, d)
+
+    Returns:
+        Tuple of (int8 array of shape (n, d), float32 scales of shape (n,))
+    """
+    scales = np.abs(vectors).max(axis=1) / 127
+    scales[scales == 0] = 1.0
+    quantized = np.clip(np.round(vectors / scales[:, None]), -127, 127).astype(np.int8)
+    return quantized, scales.astype(np.float32)
+
+
+def dequantize_int8(quantized: np.ndarray, scales: np.ndarray) -> np.ndarray:
+    """Inverse of quantize_int8"""
+    return quantized.astype(np.float32) * scales[:, None]
+
+
+def maximal_marginal_relevance(
+    query: np.ndarray,
+    candidates: np.ndarray,
+    k: int,
+    lambda_mult: float
+) -> List[int]:
+    """
+    Pick k candidates that are relevant to the query but not to each other
+
+    Relevance and pairwise similarity are computed up front in two matrix
+    products, so each selection step is a single argmax.
+
+    Args:
+        query: Query embedding of shape (d,)
+        candidates: Candidate embeddings of shape (n, d)
+        k: Number of candidates to select
+        lambda_mult: 1.0 ranks purely by relevance, 0.0 purely by diversity
+
+    Returns:
+        Indices into candidates, in selection order
+    """
+    k = min(k, len(candidates))
+    if k == 0:
+        return []
+
+    norms = np.linalg.norm(candidates, axis=1, keepdims=True)
+    candidates = candidates / np.where(norms == 0, 1.0, norms)
+    query = query / (np.linalg.norm(query) or 1.0)
+
+    relevance = candidates @ query
+    similarity = candidates @ candidates.T
+
+    selected = [int(np.argmax(relevance))]
+    # Each candidate's highest similarity to anything already selected
+    redundancy = similarity[selected[0]].copy()
+    while len(selected) < k:
+        scores = lambda_mult * relevance - (1.0 - lambda_mult) * redundancy
+        scores[selected] = -np.inf
+        best = int(np.argmax(scores))
+        selected.append(best)
+        np.maximum(redundancy, similarity[best], out=redundancy)
+
+    return selected
+
+
+class ReadWriteLock:
+    """
+    Lock shared by any number of readers or held by one writer
+
+    A waiting writer blocks new readers, so a steady stream of queries
+    can't starve a reload.
+    """
+
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._readers = 0
+        self._writing = False
+        self._writers_waiting = 0
+
+    @contextmanager
+    def read(self):
+        with self._condition:
+            while self._writing or self._writers_waiting:
+                self._condition.wait()
+            self._readers += 1
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._readers -= 1
+                if not self._readers:
+                    self._condition.notify_all()
+
+    @contextmanager
+    def write(self):
+        with self._condition:
+            self._writers_waiting += 1
+            while self._writing or self._readers:
+                self._condition.wait()
+            self._writers_waiting -= 1
+            self._writing = True
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._writing = False
+                self._condition.notify_all()
+
+
+class EmbeddingCache:
+    """
+    SQLite-backed cache of chunk embeddings keyed by content hash
+
+    Unchanged chunks are served locally on re-ingestion instead of being
+    sent to the embeddings API again. Vectors are stored int8-quantized
+    (a float32 scale followed by one byte per dimension), a quarter of the
+    float32 size at a cosine-similarity error well under 0.1%.
+    """
+
+    # Keys per SELECT, below SQLite's bound-parameter limit
+    LOOKUP_BATCH_SIZE = 500
+
+    def __init__(self, path: str):
+        self.path = path
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+
+        with closing(sqlite3.connect(self.path)) as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings_int8 (key TEXT PRIMARY KEY, vector BLOB NOT NULL)"
+            )
+            conn.commit()
+
+    def get_many(self, keys: List[str]) -> Dict[str, List[float]]:
+        """
+        Look up several embeddings at once
+
+        Args:
+            keys: Keys from embedding_key
+
+        Returns:
+            Mapping of key to embedding for every hit
+        """
+        hits = {}
+        with closing(sqlite3.connect(self.path)) as conn:
+            for start in range(0, len(keys), self.LOOKUP_BATCH_SIZE):
+                batch = keys[start:start + self.LOOKUP_BATCH_SIZE]
+                rows = conn.execute(
+                    f"SELECT key, vector FROM embeddings_int8 WHERE key IN ({','.join('?' * len(batch))})",
+                    batch
+                ).fetchall()
+                if not rows:
+                    continue
+
+                scales = np.array([np.frombuffer(blob[:4], dtype=np.float32)[0] for _, blob in rows])
+                quantized = np.stack([np.frombuffer(blob[4:], dtype=np.int8) for _, blob in rows])
+                for (key, _), vector in zip(rows, dequantize_int8(quantized, scales)):
+                    hits[key] = vector.tolist()
+        return hits
+
+    def put_many(self, items: Dict[str, List[float]]):
+        """Store embeddings, int8-quantized"""
+        if not items:
+            return
+
+        quantized, scales = quantize_int8(np.array(list(items.values()), dtype=np.float32))
+        with closing(sqlite3.connect(self.path)) as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO embeddings_int8 VALUES (?, ?)",
+                [
+                    (key, scale.tobytes() + vector.tobytes())
+                    for key, scale, vector in zip(items, scales, quantized)
+                ]
+            )
+            conn.commit()
+
+
+class SemanticCache:
+    """
+    In-memory cache of answers keyed by question embedding
+
+    A cached answer is reused when a new question is nearly identical in
+    meaning and retrieves mostly the same chunks, so paraphrased questions
+    skip the LLM call without being served an answer grounded in different
+    evidence. Embeddings live in one preallocated matrix, making a lookup a
+    single matrix-vector product; the oldest entries are overwritten first.
+    """
+
+    def __init__(self, max_entries: int, threshold: float, min_overlap: float):
+        self.max_entries = max_entries
+        self.threshold = threshold
+        self.min_overlap = min_overlap
+
+        self._vectors: Optional[np.ndarray] = None
+        self._entries: List[Tuple[frozenset, Dict]] = []
+        self._next = 0
+        self._lock = threading.Lock()
+
+    def lookup(self, embedding: List[float], evidence: frozenset) -> Optional[Dict]:
+        """
+        Find a cached answer for a question
+
+        Args:
+            embedding: Question embedding
+            evidence: Chunk ids retrieved for the question
+
+        Returns:
+            The cached result, or None on a miss
+        """
+        with self._lock:
+            if not self._entries:
+                return None
+
+            similarities = self._vectors[:len(self._entries)] @ self._normalize(embedding)
+            best = int(np.argmax(similarities))
+            if similarities[best] < self.threshold:
+                return None
+
+            cached_evidence, result = self._entries[best]
+            union = evidence | cached_evidence
+            if union and len(evidence & cached_evidence) / len(union) < self.min_overlap:
+                return None
+
+            return result
+
+    def add(self, embedding: List[float], evidence: frozenset, result: Dict):
+        """Cache the result for a question"""
+        with self._lock:
+            vector = self._normalize(embedding)
+            if self._vectors is None:
+                self._vectors = np.empty((self.max_entries, len(vector)), dtype=np.float32)
+
+            self._vectors[self._next] = vector
+            if len(self._entries) < self.max_entries:
+                self._entries.append((evidence, result))
+            else:
+                self._entries[self._next] = (evidence, result)
+            self._next = (self._next + 1) % self.max_entries
+
+    def clear(self):
+        """Drop all cached answers"""
+        with self._lock:
+            self._entries.clear()
+            self._next = 0
+
+    @staticmethod
+    def _normalize(embedding: List[float]) -> np.ndarray:
+        vector = np.asarray(embedding, dtype=np.float32)
+        return vector / (np.linalg.norm(vector) or 1.0)
 
 
 class DocumentProcessor:
@@ -79,30 +431,25 @@ class DocumentProcessor:
         Returns:
             List of Document objects with content and metadata
         """
-        documents = []
+        root = Path(directory_path).resolve()
+        paths = sorted(root.rglob("*.md"))
+
+        contents = asyncio.run(_read_texts(paths))
 
-        for root, _, files in os.walk(directory_path):
-            for file in files:
-                if file.endswith('.md'):
-                    file_path = os.path.join(root, file)
-                    try:
-                        with open(file_path, 'r', encoding='utf-8') as f:
-                            content = f.read()
-
-                        # Extract metadata from path
-                        relative_path = os.path.relpath(file_path, directory_path)
-
-                        documents.append(Document(
-                            page_content=content,
-                            metadata={
-                                'source': relative_path,
-                                'file_path': file_path,
-                                'file_name': file,
-                                'tokens': len(self.tokenizer.encode(content))
-                            }
-                        ))
-                    except Exception as e:
-                        print(f"Error loading {file_path}: {e}")
+        documents = []
+        for path, content in zip(paths, contents):
+            if content is None:
+                continue
+
+            documents.append(Document(
+                page_content=content,
+                metadata={
+                    'source': os.path.relpath(path, root),
+                    'file_path': str(path),
+                    'file_name': path.name,
+                    'docs_directory': str(root)
+                }
+            ))
 
         return documents
 
@@ -114,7 +461,8 @@ class DocumentProcessor:
             documents: List of documents to chunk
 
         Returns:
-            List of chunked documents with preserved metadata
+            List of chunked documents with preserved metadata and a
+            per-chunk token count
         """
         chunked_docs = []
 
@@ -132,6 +480,11 @@ class DocumentProcessor:
                 )
                 chunked_docs.append(chunked_doc)
 
+        # One batched, multithreaded encode over all chunks; counts only, so skip special-token checks
+        token_counts = self.tokenizer.encode_ordinary_batch([doc.page_content for doc in chunked_docs])
+        for doc, tokens in zip(chunked_docs, token_counts):
+            doc.metadata['tokens'] = len(tokens)
+
         return chunked_docs
 
     def process_documents(self, directory_path: str) -> List[Document]:
@@ -158,25 +511,34 @@ class DocumentProcessor:
 class VectorStore:
     """Manages vector database for document embeddings"""
 
-    def __init__(self, config: RAGConfig):
+    def __init__(self, config: RAGConfig, http_async_client: Optional[httpx.AsyncClient] = None):
         self.config = config
         self.embeddings = OpenAIEmbeddings(
             model=config.embedding_model,
-            openai_api_key=config.openai_api_key
+            dimensions=config.embedding_dimensions,
+            openai_api_key=config.openai_api_key,
+            http_async_client=http_async_client
         )
 
-        # Initialize Chroma client
-        self.client = chromadb.Client(Settings(
-            chroma_db_impl="duckdb+parquet",
-            persist_directory=config.chroma_persist_directory
-        ))
+        # Initialize Chroma client (SQLite + HNSW index, persisted automatically)
+        self.client = chromadb.PersistentClient(path=config.chroma_persist_directory)
 
+        self.embedding_cache = EmbeddingCache(config.embedding_cache_path)
         self.vectorstore: Optional[Chroma] = None
+        # Searches read the Chroma client; reopen replaces it
+        self._access = ReadWriteLock()
 
     def create_vectorstore(self, documents: List[Document]) -> Chroma:
         """
         Create vector store from documents
 
+        All chunks are embedded up front in a few large, concurrent
+        embeddings requests and written to the collection in one call.
+        Identical chunks are embedded once, and chunks found in the
+        embedding cache are not sent to the API. Chunks from earlier
+        ingestions of the same docs directories that no longer exist (the
+        file shrank or was deleted) are removed afterwards.
+
         Args:
             documents: List of processed documents
 
@@ -185,18 +547,118 @@ class VectorStore:
         """
         print(f"Creating embeddings for {len(documents)} chunks...")
 
-        self.vectorstore = Chroma.from_documents(
-            documents=documents,
-            embedding=self.embeddings,
-            collection_name=self.config.collection_name,
-            persist_directory=self.config.chroma_persist_directory
-        )
+        texts = [doc.page_content for doc in documents]
+        vectors = self._embed_with_cache(texts)
+
+        collection = self.collection()
+        if documents:
+            ids = [chunk_id(doc.metadata) for doc in documents]
+            collection.upsert(
+                ids=ids,
+                embeddings=vectors,
+                documents=texts,
+                metadatas=[doc.metadata for doc in documents]
+            )
+
+            # Deleting after the upsert keeps the directory searchable throughout
+            current = set(ids)
+            for directory in sorted({doc.metadata['docs_directory'] for doc in documents}):
+                existing = collection.get(where={"docs_directory": directory}, include=[])["ids"]
+                stale = [existing_id for existing_id in existing if existing_id not in current]
+                if stale:
+                    collection.delete(ids=stale)
 
-        self.vectorstore.persist()
+        self.vectorstore = self.load_vectorstore()
         print("Vector store created and persisted")
 
         return self.vectorstore
 
+    def _embed_with_cache(self, texts: List[str]) -> List[List[float]]:
+        """
+        Embed texts, reusing cached embeddings and caching new ones
+
+        Args:
+            texts: Texts to embed
+
+        Returns:
+            One embedding per text, in input order
+        """
+        model = f"{self.config.embedding_model}@{self.config.embedding_dimensions}"
+        keys = [embedding_key(model, text) for text in texts]
+
+        # Boilerplate repeated across files (licence blocks, navigation) is looked up and embedded once
+        unique = dict(zip(keys, texts))
+        cached = self.embedding_cache.get_many(list(unique))
+
+        misses = [key for key in unique if key not in cached]
+        print(
+            f"Embedding cache: {len(unique) - len(misses)} hits, {len(misses)} misses, "
+            f"{len(texts) - len(unique)} duplicates"
+        )
+
+        if misses:
+            fresh = asyncio.run(self._embed_texts([unique[key] for key in misses]))
+            new_items = dict(zip(misses, fresh))
+            self.embedding_cache.put_many(new_items)
+            cached.update(new_items)
+
+        return [cached[key] for key in keys]
+
+    async def _embed_texts(self, texts: List[str]) -> List[List[float]]:
+        """
+        Embed texts in concurrent batches of EMBEDDING_BATCH_SIZE
+
+        Args:
+            texts: Texts to embed
+
+        Returns:
+            One embedding per text, in input order
+        """
+        client = openai.AsyncOpenAI(api_key=self.config.openai_api_key)
+        try:
+            responses = await asyncio.gather(*(
+                client.embeddings.create(
+                    model=self.config.embedding_model,
+                    dimensions=self.config.embedding_dimensions,
+                    input=texts[start:start + EMBEDDING_BATCH_SIZE]
+                )
+                for start in range(0, len(texts), EMBEDDING_BATCH_SIZE)
+            ))
+        finally:
+            await client.close()
+
+        return [item.embedding for response in responses for item in response.data]
+
+    def collection(self) -> chromadb.Collection:
+        """Return the Chroma collection, creating it with COLLECTION_METADATA if needed"""
+        return self.client.get_or_create_collection(
+            self.config.collection_name,
+            metadata=COLLECTION_METADATA
+        )
+
+    def count(self) -> int:
+        """Number of chunks in the collection"""
+        with self._access.read():
+            return self.collection().count()
+
+    def reopen(self) -> Chroma:
+        """
+        Reconnect to the persisted collection to pick up another process's writes
+
+        Chroma keeps one client per path in each process, so that cache is
+        cleared before connecting again. Clearing it tears down the client
+        searches use, so it waits for running searches and holds off new
+        ones until the new client is in place.
+
+        Returns:
+            Chroma vector store instance
+        """
+        with self._access.write():
+            self.client.clear_system_cache()
+            self.client = chromadb.PersistentClient(path=self.config.chroma_persist_directory)
+
+            return self.load_vectorstore()
+
     def load_vectorstore(self) -> Chroma:
         """
         Load existing vector store from disk
@@ -205,9 +667,10 @@ class VectorStore:
             Chroma vector store instance
         """
         self.vectorstore = Chroma(
+            client=self.client,
             collection_name=self.config.collection_name,
             embedding_function=self.embeddings,
-            persist_directory=self.config.chroma_persist_directory
+            collection_metadata=COLLECTION_METADATA
         )
 
         return self.vectorstore
@@ -227,21 +690,115 @@ class VectorStore:
         Returns:
             List of (Document, similarity_score) tuples
         """
+        return self.similarity_search_by_vector(self.embeddings.embed_query(query), k)
+
+    def similarity_search_by_vector(
+        self,
+        embedding: List[float],
+        k: int = None
+    ) -> List[Tuple[Document, float]]:
+        """
+        Search for documents similar to an already embedded query
+
+        Args:
+            embedding: Query embedding
+            k: Number of results to return
+
+        Returns:
+            List of (Document, cosine_similarity) tuples above
+            similarity_threshold, most similar first (or in MMR selection
+            order when use_mmr is set)
+        """
         k = k or self.config.top_k_results
+        with self._access.read():
+            if self.config.use_mmr:
+                return self._mmr_search_by_vector(embedding, k)
 
-        results = self.vectorstore.similarity_search_with_score(
-            query=query,
-            k=k
-        )
+            results = self.vectorstore.similarity_search_by_vector_with_relevance_scores(
+                embedding=embedding,
+                k=k
+            )
 
-        # Filter by similarity threshold
+        # Chroma returns cosine distances; filter on similarity instead
         filtered_results = [
-            (doc, score) for doc, score in results
-            if score >= self.config.similarity_threshold
+            (doc, 1.0 - distance) for doc, distance in results
+            if 1.0 - distance >= self.config.similarity_threshold
         ]
 
         return filtered_results
 
+    def _mmr_search_by_vector(
+        self,
+        embedding: List[float],
+        k: int
+    ) -> List[Tuple[Document, float]]:
+        """
+        Retrieve mmr_fetch_k candidates and keep the k that MMR selects
+
+        Args:
+            embedding: Query embedding
+            k: Number of results to return
+
+        Returns:
+            List of (Document, cosine_similarity) tuples above
+            similarity_threshold, in MMR selection order
+        """
+        results = self.collection().query(
+            query_embeddings=[embedding],
+            n_results=max(k, self.config.mmr_fetch_k),
+            include=["documents", "metadatas", "distances", "embeddings"]
+        )
+
+        # Chroma returns cosine distances; filter on similarity before re-ranking
+        similarities = 1.0 - np.asarray(results["distances"][0], dtype=np.float32)
+        keep = np.flatnonzero(similarities >= self.config.similarity_threshold)
+        if keep.size == 0:
+            return []
+
+        candidates = np.asarray(results["embeddings"][0], dtype=np.float32)[keep]
+        selected = maximal_marginal_relevance(
+            np.asarray(embedding, dtype=np.float32),
+            candidates,
+            k,
+            self.config.mmr_lambda
+        )
+
+        return [
+            (
+                Document(
+                    page_content=results["documents"][0][keep[i]],
+                    metadata=results["metadatas"][0][keep[i]]
+                ),
+                float(similarities[keep[i]])
+            )
+            for i in selected
+        ]
+
+
+@dataclass
+class PendingAnswer:
+    """A retrieved question on its way to an answer, shared by the sync, async and streaming paths"""
+    question: str
+    standalone_question: str
+    session_id: Optional[str]
+    memory: Optional[ConversationBufferWindowMemory]
+    embedding: List[float]
+    docs: List[Document]
+    scores: List[float]
+    evidence: frozenset
+    use_cache: bool
+    cached: Optional[Dict[str, any]]
+
+    @property
+    def ready_answer(self) -> Optional[str]:
+        """Answer known without calling the LLM, or None if it must be generated"""
+        if self.cached is not None:
+            return self.cached['answer']
+        if not self.docs:
+            # Nothing relevant was retrieved, so an LLM call could only guess
+            return NO_ANSWER
+        return None
+
 
 class RAGPipeline:
     """Main RAG pipeline orchestrating retrieval and generation"""
@@ -249,15 +806,36 @@ class RAGPipeline:
     def __init__(self, config: RAGConfig):
         self.config = config
 
+        # One connection pool for the embedding and completion legs of each query
+        self.http_client = build_async_http_client()
+
         # Initialize components
+        # Streaming lets astream_query forward tokens as they arrive; query
+        # still receives the complete answer
         self.llm = ChatOpenAI(
             model_name=config.llm_model,
             temperature=config.temperature,
-            openai_api_key=config.openai_api_key
+            openai_api_key=config.openai_api_key,
+            streaming=True,
+            http_async_client=self.http_client
         )
 
-        self.vector_store = VectorStore(config)
-        self.conversation_memory: Dict[str, ConversationBufferMemory] = {}
+        self.vector_store = VectorStore(config, http_async_client=self.http_client)
+        # Bounded and expiring, so abandoned sessions don't accumulate
+        self.conversation_memory: TTLCache = TTLCache(
+            maxsize=config.max_sessions,
+            ttl=config.session_ttl_seconds
+        )
+        self.answer_cache = SemanticCache(
+            max_entries=config.semantic_cache_size,
+            threshold=config.semantic_cache_threshold,
+            min_overlap=config.semantic_cache_min_overlap
+        )
+        # Bounds batch answer generation; a semaphore is bound to the event
+        # loop it's first used on, so each loop gets its own
+        self._answer_semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = (
+            weakref.WeakKeyDictionary()
+        )
 
     def initialize_from_documents(self, docs_directory: str):
         """
@@ -269,29 +847,60 @@ class RAGPipeline:
         processor = DocumentProcessor(self.config)
         documents = processor.process_documents(docs_directory)
         self.vector_store.create_vectorstore(documents)
+        self._reset_query_state()
 
     def load_existing(self):
         """Load existing vector store from disk"""
         self.vector_store.load_vectorstore()
-
-    def get_or_create_memory(self, session_id: str) -> ConversationBufferMemory:
+        self._reset_query_state()
+
+    def reload(self):
+        """Reload the vector store after the ingestion worker updated it"""
+        self.vector_store.reopen()
+        self._reset_query_state()
+
+    def _reset_query_state(self):
+        """Drop cached answers from a previous vector store"""
+        self.answer_cache.clear()
+
+    @property
+    def llm(self):
+        """LLM used to condense follow-up questions and generate answers"""
+        return self._llm
+
+    @llm.setter
+    def llm(self, llm):
+        # The chains hold no per-query state, so they are built once per LLM
+        self._llm = llm
+        self._condense_chain = LLMChain(llm=llm, prompt=CONDENSE_QUESTION_PROMPT)
+        self._qa_chain = load_qa_chain(llm, chain_type="stuff")
+
+    def get_or_create_memory(self, session_id: str) -> ConversationBufferWindowMemory:
         """
         Get or create conversation memory for a session
 
+        The memory keeps only the last max_history_length exchanges, which
+        bounds the prompt size of follow-up questions. Each access renews
+        the session's TTL.
+
         Args:
             session_id: Unique session identifier
 
         Returns:
-            ConversationBufferMemory instance
+            ConversationBufferWindowMemory instance
         """
-        if session_id not in self.conversation_memory:
-            self.conversation_memory[session_id] = ConversationBufferMemory(
+        memory = self.conversation_memory.get(session_id)
+        if memory is None:
+            memory = ConversationBufferWindowMemory(
+                k=self.config.max_history_length,
                 memory_key="chat_history",
                 return_messages=True,
                 output_key="answer"
             )
 
-        return self.conversation_memory[session_id]
+        # Re-inserting resets the entry's expiry time
+        self.conversation_memory[session_id] = memory
+        return memory
 
     def query(
         self,
@@ -301,6 +910,12 @@ class RAGPipeline:
         """
         Query the RAG system
 
+        Questions asked without prior conversation history are first
+        checked against the semantic answer cache, which skips the LLM call
+        for repeated or paraphrased questions. The LLM is also skipped when
+        no chunk passes similarity_threshold. Blocks until the answer is
+        complete; code running on an event loop should await aquery instead.
+
         Args:
             question: User's question
             session_id: Optional session ID for conversation context
@@ -311,30 +926,269 @@ class RAGPipeline:
                 - sources: List of source documents
                 - confidence: Confidence score
         """
-        # Get conversation memory if session provided
-        memory = None
-        if session_id:
-            memory = self.get_or_create_memory(session_id)
-
-        # Create conversational retrieval chain
-        qa_chain = ConversationalRetrievalChain.from_llm(
-            llm=self.llm,
-            retriever=self.vector_store.vectorstore.as_retriever(
-                search_kwargs={"k": self.config.top_k_results}
-            ),
+        memory, history = self._session(session_id)
+        pending = self._prepare_answer(question, session_id, memory, history, *self._retrieve(question, history))
+
+        answer = pending.ready_answer
+        if answer is None:
+            answer = self._qa_chain.run(input_documents=pending.docs, question=pending.standalone_question)
+
+        return self._finish_answer(pending, answer)
+
+    async def aquery(
+        self,
+        question: str,
+        session_id: Optional[str] = None
+    ) -> Dict[str, any]:
+        """
+        Query the RAG system without blocking the event loop
+
+        Same behaviour as query, using the async OpenAI clients for the
+        condense, embedding and answer calls.
+
+        Args:
+            question: User's question
+            session_id: Optional session ID for conversation context
+
+        Returns:
+            Dictionary containing:
+                - answer: Generated response
+                - sources: List of source documents
+                - confidence: Confidence score
+        """
+        memory, history = self._session(session_id)
+        pending = self._prepare_answer(question, session_id, memory, history, *await self._aretrieve(question, history))
+
+        answer = pending.ready_answer
+        if answer is None:
+            answer = await self._qa_chain.arun(input_documents=pending.docs, question=pending.standalone_question)
+
+        return self._finish_answer(pending, answer)
+
+    async def abatch_query(self, questions: List[str]) -> List[Dict[str, any]]:
+        """
+        Answer several independent questions concurrently
+
+        All questions are embedded in a single request, then their Chroma
+        lookups and answer generations run concurrently, with at most
+        max_concurrent_answers LLM calls in flight. Batch questions have no
+        conversation context, so each one can be served from the answer
+        cache.
+
+        Args:
+            questions: Questions to answer
+
+        Returns:
+            One result per question, in input order, shaped like aquery's
+        """
+        embeddings = await self.vector_store.embeddings.aembed_documents(questions)
+        searches = await asyncio.gather(*(
+            asyncio.to_thread(self.vector_store.similarity_search_by_vector, embedding)
+            for embedding in embeddings
+        ))
+
+        return list(await asyncio.gather(*(
+            self._aanswer(self._prepare_answer(question, None, None, [], question, embedding, results))
+            for question, embedding, results in zip(questions, embeddings, searches)
+        )))
+
+    async def _aanswer(self, pending: PendingAnswer) -> Dict[str, any]:
+        """Generate the answer for a prepared question unless it is already known"""
+        answer = pending.ready_answer
+        if answer is None:
+            semaphore = self._answer_semaphores.setdefault(
+                asyncio.get_running_loop(),
+                asyncio.Semaphore(self.config.max_concurrent_answers)
+            )
+            async with semaphore:
+                answer = await self._qa_chain.arun(input_documents=pending.docs, question=pending.standalone_question)
+
+        return self._finish_answer(pending, answer)
+
+    async def astream_query(
+        self,
+        question: str,
+        session_id: Optional[str] = None
+    ) -> AsyncIterator[Dict[str, any]]:
+        """
+        Query the RAG system, yielding the answer while it is generated
+
+        Follows the same steps as aquery, but forwards the LLM's tokens as
+        soon as they arrive instead of waiting for the complete answer.
+
+        Args:
+            question: User's question
+            session_id: Optional session ID for conversation context
+
+        Yields:
+            {'token': str} events, then one final event containing:
+                - sources: List of source documents
+                - confidence: Confidence score
+                - session_id: The session ID
+        """
+        memory, history = self._session(session_id)
+        pending = self._prepare_answer(question, session_id, memory, history, *await self._aretrieve(question, history))
+
+        answer = pending.ready_answer
+        if answer is not None:
+            yield {'token': answer}
+        else:
+            # A handler per call keeps concurrent streams apart
+            handler = AsyncIteratorCallbackHandler()
+            task = asyncio.create_task(self._qa_chain.arun(
+                input_documents=pending.docs,
+                question=pending.standalone_question,
+                callbacks=[handler]
+            ))
+            # Stop iterating even if the chain fails before the LLM starts
+            task.add_done_callback(lambda _: handler.done.set())
+
+            streamed = False
+            try:
+                async for token in handler.aiter():
+                    streamed = True
+                    yield {'token': token}
+                answer = await task
+            finally:
+                # The client may disconnect mid-stream
+                task.cancel()
+
+            if not streamed:
+                # LLMs without streaming support only report the final answer
+                yield {'token': answer}
+
+        response = self._finish_answer(pending, answer)
+        yield {
+            'sources': response['sources'],
+            'confidence': response['confidence'],
+            'session_id': session_id
+        }
+
+    def _session(self, session_id: Optional[str]) -> Tuple[Optional[ConversationBufferWindowMemory], List]:
+        """Return the session's memory and chat history (None and [] without a session)"""
+        memory = self.get_or_create_memory(session_id) if session_id else None
+        history = memory.load_memory_variables({})["chat_history"] if memory else []
+        return memory, history
+
+    def _prepare_answer(
+        self,
+        question: str,
+        session_id: Optional[str],
+        memory: Optional[ConversationBufferWindowMemory],
+        history: List,
+        standalone_question: str,
+        embedding: List[float],
+        results: List[Tuple[Document, float]]
+    ) -> PendingAnswer:
+        """
+        Collect what answering a retrieved question needs, checking the answer cache
+
+        Follow-up questions depend on the conversation, so only questions
+        asked without history use the cache.
+        """
+        use_cache = not history
+        docs = [doc for doc, _ in results]
+        evidence = frozenset(chunk_id(doc.metadata) for doc in docs)
+
+        return PendingAnswer(
+            question=question,
+            standalone_question=standalone_question,
+            session_id=session_id,
             memory=memory,
-            return_source_documents=True,
-            verbose=False
+            embedding=embedding,
+            docs=docs,
+            scores=[score for _, score in results],
+            evidence=evidence,
+            use_cache=use_cache,
+            cached=self.answer_cache.lookup(embedding, evidence) if use_cache else None
         )
 
-        # Execute query
-        result = qa_chain({
-            "question": question
-        })
+    def _finish_answer(self, pending: PendingAnswer, answer: str) -> Dict[str, any]:
+        """
+        Record the answer in the session memory and answer cache
 
+        Returns:
+            Dictionary with answer, sources, confidence and session_id
+        """
+        if pending.memory is not None:
+            pending.memory.save_context({"question": pending.question}, {"answer": answer})
+
+        response = pending.cached
+        if response is None:
+            response = self._build_response(answer, pending.docs, pending.scores)
+            if pending.use_cache and pending.docs:
+                self.answer_cache.add(pending.embedding, pending.evidence, response)
+
+        return {**response, 'session_id': pending.session_id}
+
+    def _retrieve(
+        self,
+        question: str,
+        history: List
+    ) -> Tuple[str, List[float], List[Tuple[Document, float]]]:
+        """
+        Rewrite a follow-up into a standalone question and retrieve its sources
+
+        Args:
+            question: User's question
+            history: Messages from the session's conversation memory
+
+        Returns:
+            Tuple of (standalone_question, query_embedding, search_results)
+        """
+        # Rewrite follow-ups into a standalone question before retrieval
+        standalone_question = question
+        if history:
+            standalone_question = self._condense_chain.run(
+                question=question,
+                chat_history=get_buffer_string(history)
+            )
+
+        # Embed once and reuse the vector for retrieval and the answer cache
+        embedding = self.vector_store.embeddings.embed_query(standalone_question)
+        results = self.vector_store.similarity_search_by_vector(embedding)
+
+        return standalone_question, embedding, results
+
+    async def _aretrieve(
+        self,
+        question: str,
+        history: List
+    ) -> Tuple[str, List[float], List[Tuple[Document, float]]]:
+        """Async counterpart of _retrieve"""
+        standalone_question = question
+        if history:
+            standalone_question = await self._condense_chain.arun(
+                question=question,
+                chat_history=get_buffer_string(history)
+            )
+
+        embedding = await self.vector_store.embeddings.aembed_query(standalone_question)
+        # Chroma queries are synchronous, so keep them off the event loop
+        results = await asyncio.to_thread(self.vector_store.similarity_search_by_vector, embedding)
+
+        return standalone_question, embedding, results
+
+    def _build_response(
+        self,
+        answer: str,
+        docs: List[Document],
+        scores: List[float]
+    ) -> Dict[str, any]:
+        """
+        Package an answer with its sources and confidence
+
+        Args:
+            answer: Generated response
+            docs: Retrieved source documents
+            scores: Cosine similarities of the retrieved documents
+
+        Returns:
+            Dictionary with answer, sources and confidence
+        """
         # Extract and format sources
         sources = []
-        for doc in result.get('source_documents', []):
+        for doc in docs:
             sources.append({
                 'content': doc.page_content[:200] + "...",  # Preview
                 'source': doc.metadata.get('source', 'Unknown'),
@@ -342,38 +1196,32 @@ class RAGPipeline:
             })
 
         # Calculate confidence based on source relevance
-        confidence = self._calculate_confidence(result.get('source_documents', []))
+        confidence = self._calculate_confidence(scores)
 
         return {
-            'answer': result['answer'],
+            'answer': answer,
             'sources': sources,
-            'confidence': confidence,
-            'session_id': session_id
+            'confidence': confidence
         }
 
-    def _calculate_confidence(self, source_docs: List[Document]) -> float:
+    def _calculate_confidence(self, scores: List[float]) -> float:
         """
         Calculate confidence score based on retrieval quality
 
         Args:
-            source_docs: Retrieved source documents
+            scores: Cosine similarities of the retrieved source documents
 
         Returns:
-            Confidence score between 0 and 1
+            Confidence score between 0 and 1 (the best match's similarity)
         """
-        if not source_docs:
+        if not scores:
             return 0.0
 
-        # Simple heuristic: more sources = higher confidence
-        # In production, you'd use actual similarity scores
-        num_sources = len(source_docs)
+        return round(max(0.0, min(1.0, max(scores))), 3)
 
-        if num_sources >= 3:
-            return 0.9
-        elif num_sources == 2:
-            return 0.7
-        else:
-            return 0.5
+    async def aclose(self):
+        """Close the shared HTTP connection pool"""
+        await self.http_client.aclose()
 
     def clear_session(self, session_id: str):
         """Clear conversation memory for a session"""
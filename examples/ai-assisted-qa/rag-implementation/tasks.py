@@ -0,0 +1,101 @@
+"""
+Celery tasks for the RAG QA Assistant
+
+Document ingestion runs on a Celery worker with Redis as broker, so it
+survives API restarts and can be scaled separately from the API.
+
+Run with: celery -A tasks worker --loglevel=info
+"""
+
+import hashlib
+import logging
+import os
+from typing import Dict
+
+import redis
+from celery import Celery
+
+from rag_pipeline import DocumentProcessor, RAGConfig, VectorStore
+
+logger = logging.getLogger(__name__)
+
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+
+# An ingestion that crashes or hangs releases its lock after this many seconds
+INGEST_LOCK_TTL_SECONDS = 900
+
+# Takes the lock if it is free or already held by the caller (a task
+# redelivered after its worker died keeps its id), renewing its expiry
+ACQUIRE_LOCK_SCRIPT = """
+local holder = redis.call("get", KEYS[1])
+if holder == false or holder == ARGV[1] then
+    return redis.call("set", KEYS[1], ARGV[1], "EX", ARGV[2])
+end
+return false
+"""
+
+# Deletes the lock only if it still belongs to the caller
+RELEASE_LOCK_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+celery_app = Celery("rag_tasks", broker=REDIS_URL, backend=REDIS_URL)
+celery_app.conf.update(
+    # Acknowledge after the task finishes, so a worker dying mid-ingest
+    # leaves the job on the queue for another worker
+    task_acks_late=True,
+    task_reject_on_worker_lost=True,
+    worker_prefetch_multiplier=1
+)
+
+redis_client = redis.Redis.from_url(REDIS_URL)
+
+
+def vectorstore_version_key(collection_name: str) -> str:
+    """Redis key of the counter bumped after each ingestion into a collection"""
+    return f"rag:vectorstore-version:{collection_name}"
+
+
+def ingest_lock_key(docs_directory: str) -> str:
+    """Redis key of the lock held while a docs directory is being ingested"""
+    digest = hashlib.sha256(os.path.abspath(docs_directory).encode("utf-8")).hexdigest()
+    return f"rag:ingest-lock:{digest}"
+
+
+@celery_app.task(bind=True, name="rag.ingest_documents")
+def ingest_task(self, docs_directory: str) -> Dict:
+    """
+    Ingest a docs directory into the vector store
+
+    Only one worker ingests a given directory at a time. A task redelivered
+    after its worker died reclaims its own lock right away; other stale
+    locks expire after INGEST_LOCK_TTL_SECONDS. On success the collection's
+    version counter is bumped, which tells API processes to reload the
+    vector store.
+
+    Args:
+        docs_directory: Path to documentation directory
+
+    Returns:
+        Dictionary with status, docs_directory and, once completed, the
+        number of chunks ingested
+    """
+    lock_key = ingest_lock_key(docs_directory)
+    if not redis_client.eval(ACQUIRE_LOCK_SCRIPT, 1, lock_key, self.request.id, INGEST_LOCK_TTL_SECONDS):
+        logger.info(f"Ingestion of {docs_directory} already running, skipping")
+        return {"status": "skipped", "docs_directory": docs_directory}
+
+    try:
+        logger.info(f"Starting document ingestion from {docs_directory}")
+        config = RAGConfig()
+        documents = DocumentProcessor(config).process_documents(docs_directory)
+        VectorStore(config).create_vectorstore(documents)
+        redis_client.incr(vectorstore_version_key(config.collection_name))
+        logger.info("Document ingestion completed")
+    finally:
+        redis_client.eval(RELEASE_LOCK_SCRIPT, 1, lock_key, self.request.id)
+
+    return {"status": "completed", "docs_directory": docs_directory, "chunks": len(documents)}
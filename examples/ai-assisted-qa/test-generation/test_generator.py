@@ -13,12 +13,48 @@ Features:
 - Customizable test frameworks
 """
 
+import asyncio
+import hashlib
+import json
 import os
-from typing import List, Dict, Optional
-from dataclasses import dataclass
+import random
+import re
+import shelve
+import sys
+import weakref
+from collections import OrderedDict
+from contextlib import aclosing
+from typing import AsyncIterator, List, Dict, Optional, Tuple
+from dataclasses import dataclass, field
+import numpy as np
 import openai
+import orjson
 from enum import Enum
 
+# Batch API jobs finish within a 24h window, usually well under an hour
+BATCH_POLL_INTERVAL = 30.0
+BATCH_TERMINAL_STATUSES = ("completed", "failed", "expired", "cancelled")
+
+# Rate limits, timeouts, dropped connections and 5xx responses are retried
+# with exponential backoff and full jitter
+MAX_RETRY_ATTEMPTS = 5
+RETRY_BASE_DELAY = 1.0
+RETRY_MAX_DELAY = 30.0
+RETRYABLE_ERRORS = (openai.RateLimitError, openai.APIConnectionError, openai.InternalServerError)
+
+# Per-request timeout; covers a non-streamed E2E generation at the default budget
+REQUEST_TIMEOUT = 120.0
+
+# Task name for generate_batch and stream -> AITestGenerator method building its request
+GENERATION_TASKS = {
+    "unit_tests": "_unit_test_request",
+    "integration_tests": "_integration_test_request",
+    "e2e_tests": "_e2e_test_request",
+    "test_data": "_test_data_request",
+    "test_data_multi": "_test_data_multi_request",
+    "missing_tests": "_missing_tests_request"
+}
+
 
 class TestFramework(Enum):
     """Supported testing frameworks"""
@@ -30,6 +66,9 @@ class TestFramework(Enum):
     PLAYWRIGHT = "Playwright"
     CYPRESS = "Cypress"
 
+    def __str__(self) -> str:
+        return self._value_
+
 
 class TestType(Enum):
     """Types of tests to generate"""
@@ -42,19 +81,302 @@ class TestType(Enum):
 @dataclass
 class TestGenerationConfig:
     """Configuration for test generation"""
-    openai_api_key: str = os.getenv("OPENAI_API_KEY", "")
-    model: str = "gpt-4-turbo-preview"
+    # Read when the config is created, so setting the variable after import works
+    openai_api_key: str = field(default_factory=lambda: os.getenv("OPENAI_API_KEY", ""))
+    # Model per task; test data and coverage gap analysis don't need the larger model
+    models: Dict[str, str] = field(default_factory=lambda: {
+        "unit": "gpt-4o",
+        "integration": "gpt-4o",
+        "e2e": "gpt-4o",
+        "data": "gpt-4o-mini",
+        "missing": "gpt-4o-mini"
+    })
     temperature: float = 0.1  # Low for deterministic tests
-    max_tokens: int = 2000
+    max_tokens: int = 1200  # Answers end at END_MARKER, well before the cap
+    max_concurrency: int = 8  # Completions in flight at once, so large runs don't trip rate limits
+    cache_responses: bool = True
+    cache_max_temperature: float = 0.1  # Responses sampled above this are meant to vary, so aren't cached
+    # Reuse responses for near-duplicate prompts; off by default because a
+    # slightly edited function would get the tests generated for its old version
+    semantic_cache: bool = False
+    semantic_cache_threshold: float = 0.92  # Min cosine similarity between prompts
+    semantic_cache_size: int = 256  # Entries kept per prompt template and settings
+    embedding_model: str = "text-embedding-3-small"
+    embedding_cache_size: int = 2048  # Input embeddings kept in memory
+    embedding_cache_path: Optional[str] = None  # Shelve file persisting embeddings across runs
+
+    def __post_init__(self):
+        # Fail here rather than with a 401 on the first API call
+        if not self.openai_api_key:
+            raise ValueError("OpenAI API key not found: set OPENAI_API_KEY or pass openai_api_key")
+
+
+@dataclass
+class _LoopState:
+    """Asyncio objects bound to one event loop"""
+    # AsyncOpenAI client shared by all generators, by API key
+    clients: Dict[str, openai.AsyncOpenAI] = field(default_factory=dict)
+    # Concurrency limit of each generator
+    semaphores: "weakref.WeakKeyDictionary[AITestGenerator, asyncio.Semaphore]" = field(
+        default_factory=weakref.WeakKeyDictionary
+    )
+
+
+# Client connection pools and semaphores are bound to the loop they were
+# first used on, so each loop (e.g. each asyncio.run) gets its own, dropped
+# with the loop.
+_LOOP_STATES: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, _LoopState]" = weakref.WeakKeyDictionary()
+
+
+def _loop_state() -> _LoopState:
+    """Return the state of the running event loop"""
+    return _LOOP_STATES.setdefault(asyncio.get_running_loop(), _LoopState())
+
+
+def shared_client(api_key: str) -> openai.AsyncOpenAI:
+    """Return the AsyncOpenAI client for api_key on the running event loop"""
+    clients = _loop_state().clients
+    if api_key not in clients:
+        # Retries are handled by AITestGenerator._create_with_retry, which adds jitter
+        clients[api_key] = openai.AsyncOpenAI(api_key=api_key, max_retries=0, timeout=REQUEST_TIMEOUT)
+    return clients[api_key]
+
+
+def cache_key(model: str, messages: List[Dict[str, str]], temperature: float, max_tokens: int) -> str:
+    """Key identifying a chat completion request in the response cache"""
+    payload = json.dumps(
+        {"model": model, "messages": messages, "temperature": temperature, "max_tokens": max_tokens},
+        sort_keys=True
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+# A fenced code block tagged with its file kind by E2E_TEST_PROMPT, either
+# after the language ("```typescript test") or on its own ("```fixture");
+# untagged blocks are treated as tests
+E2E_FILE_PATTERN = re.compile(
+    r"^```(?:[\w+#-]*[ \t]+)?(?:(page_object|test|fixture)(?![\w+#-]))?[^\n]*\n(.*?)^```",
+    re.MULTILINE | re.DOTALL
+)
+E2E_FILE_KEYS = {"page_object": "page_objects", "test": "tests", "fixture": "fixtures"}
+
+
+def split_e2e_files(content: str) -> Dict[str, str]:
+    r"""
+    Split an E2E generation into its page objects, tests and fixtures
+
+    Blocks of the same kind are joined with a blank line. The raw response
+    is kept under "combined".
+
+    >>> split_e2e_files("```typescript page_object\nclass LoginPage {}\n```")["page_objects"]
+    'class LoginPage {}'
+    >>> split_e2e_files("```page_object\nclass LoginPage {}\n```")["page_objects"]
+    'class LoginPage {}'
+    >>> split_e2e_files("```typescript fixture\nexport const user = {};\n```")["fixtures"]
+    'export const user = {};'
+    >>> split_e2e_files("```fixture\nexport const user = {};\n```")["fixtures"]
+    'export const user = {};'
+    >>> split_e2e_files("```typescript test\ntest('logs in');\n```")["tests"]
+    "test('logs in');"
+    >>> split_e2e_files("```test\ntest('logs in');\n```")["tests"]
+    "test('logs in');"
+    >>> split_e2e_files("```typescript\ntest('logs in');\n```")["tests"]
+    "test('logs in');"
+    >>> split_e2e_files("```\ntest('logs in');\n```")["tests"]
+    "test('logs in');"
+    """
+    files = {key: [] for key in E2E_FILE_KEYS.values()}
+    for match in E2E_FILE_PATTERN.finditer(content):
+        files[E2E_FILE_KEYS[match.group(1) or "test"]].append(match.group(2).rstrip())
+
+    return {**{key: "\n\n".join(blocks) for key, blocks in files.items()}, "combined": content}
+
+
+async def collect(tokens: AsyncIterator[str]) -> str:
+    """Join a streamed generation into the full completion text"""
+    return "".join([token async for token in tokens])
+
+
+class SemanticCache:
+    """
+    In-memory cache of completions keyed by prompt embedding
+
+    A lookup returns the stored completion whose prompt is most similar to
+    the query, provided the cosine similarity reaches the threshold.
+    """
+
+    def __init__(self, threshold: float, max_entries: int):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self._embeddings = np.empty((0, 0), dtype=np.float32)  # Unit-normalized, one row per entry
+        self._responses: List[str] = []
+
+    def lookup(self, embedding: np.ndarray) -> Optional[str]:
+        """Return the cached completion for the most similar prompt, if similar enough"""
+        if not self._responses:
+            return None
+
+        similarities = self._embeddings @ self._normalize(embedding)
+        best = int(np.argmax(similarities))
+        return self._responses[best] if similarities[best] >= self.threshold else None
+
+    def add(self, embedding: np.ndarray, response: str):
+        """Store a completion, evicting the oldest entry when full"""
+        vector = self._normalize(embedding)[None, :]
+        if self._responses:
+            vector = np.vstack([self._embeddings, vector])
+
+        self._embeddings = vector[-self.max_entries:]
+        self._responses = (self._responses + [response])[-self.max_entries:]
+
+    @staticmethod
+    def _normalize(embedding: np.ndarray) -> np.ndarray:
+        return embedding / (np.linalg.norm(embedding) or 1.0)
+
+
+# Code answers end with this line; it's a stop sequence, so generation halts
+# there and the marker isn't part of the returned text. It can't occur in
+# generated code, unlike e.g. "# END", which also prefixes "# ENDPOINT tests".
+END_MARKER = "<<END_OF_ANSWER>>"
+END_INSTRUCTION = f"When the answer is complete, write a final line containing only {END_MARKER}."
+COMPLETION_STOP = [END_MARKER]
+JSON_RESPONSE_FORMAT = {"type": "json_object"}
+# Completion budget per test data sample; the config max_tokens is the floor
+TEST_DATA_TOKENS_PER_SAMPLE = 200
+
+# Roles opening each task's system message. General test-writing style
+# lives here rather than being repeated in each task prompt.
+UNIT_TEST_ROLE = (
+    "You are an expert software testing engineer. Write production-ready tests: descriptive names, "
+    "Arrange-Act-Assert, setup/teardown and describe/context grouping where useful, comments on complex "
+    "assertions, realistic data instead of magic numbers."
+)
+INTEGRATION_TEST_ROLE = "You are an integration testing expert. Isolate each test with its own setup/teardown of test data."
+E2E_TEST_ROLE = (
+    "You are an E2E testing specialist. Prefer data-testid selectors, use explicit waits instead of sleeps, "
+    "and assert both UI state and API responses where applicable."
+)
+TEST_DATA_ROLE = "You are a test data generation expert. Use realistic, diverse values."
+MISSING_TESTS_ROLE = "You are a test coverage expert."
+
+# Task instructions. Together with the role they form a system message that
+# is identical for every call of the task, while the user message carries
+# only the per-call INPUT section. Repeated generations thus share the
+# whole system message as a prefix for OpenAI's automatic prompt cache.
+# INPUT flags are 1/0: edge = edge and boundary cases, err = error paths,
+# auth = authentication/authorization, pom = Page Object Model.
+UNIT_TEST_PROMPT = """Task: Unit tests for the code under INPUT, in its language and framework.
+- Reach the coverage goal: happy paths, null/empty inputs, type validation
+- edge=1: edge and boundary cases; err=1: every exception path
+- Test positive and negative cases; verify return values and side effects
+Output: One complete, runnable test file with all imports."""
+
+INTEGRATION_TEST_PROMPT = """Task: Integration tests for the API/component under INPUT, in its framework.
+- Cover success, input validation, 4xx/5xx errors, database effects, response schema; auth=1: authentication/authorization
+- Use a suitable HTTP client; check status codes, body structure, headers; idempotency where applicable
+Output: Complete integration test suite with setup/teardown."""
+
+E2E_TEST_PROMPT = """Task: E2E tests validating the user story under INPUT, in its framework.
+- Cover the happy path, alternative paths, errors (invalid inputs, network) and edge cases
+- pom=1: Page Object Model; pom=0: direct selectors, no page objects
+Output: Page object classes (pom=1 only), a test file and a fixture file with test data, each in its own fenced code block whose info string is the language then the file kind (page_object, test or fixture), e.g. ```typescript test"""
+
+TEST_DATA_PROMPT = """Task: Test data for the schema under INPUT.
+- Generate the number of samples given under INPUT
+- Output a JSON object whose "samples" key holds the array of samples
+
+"""
+
+# Follow TEST_DATA_PROMPT for each data_type
+TEST_DATA_RULES = {
+    "valid": "VALID: follow all validation rules, keep referential integrity, use realistic and diverse values (names, emails, locales, formats)",
+    "invalid": "INVALID: each sample fails validation for a different reason (rule, boundary or type violations)",
+    "edge_case": "EDGE CASE: min/max values, empty/null/undefined, special characters and Unicode, very long strings, unusual but valid formats"
+}
+
+# Several data types in one request; lists every type's rules so the prompt
+# doesn't depend on which types are requested
+TEST_DATA_MULTI_PROMPT = """Task: Test data for the schema under INPUT, for each data type listed there.
+- Generate the number of samples given under INPUT for each data type
+- Output a JSON object with one key per data type (valid, invalid, edge_case), each holding an array of samples
+
+""" + "\n".join(TEST_DATA_RULES.values())
+
+MISSING_TESTS_PROMPT = """Task: Tests for the code paths under INPUT that the existing tests don't cover (use the coverage report, if given).
+- Prioritize error handling, edge cases and conditional branches
+- Match the existing test style; don't duplicate existing scenarios
+Output: Bullet list of uncovered scenarios, then the new test cases, each with a note on what it covers."""
+
+# Per-call INPUT sections, filled in with str.format
+UNIT_TEST_INPUT = """Language: {language}
+Framework: {framework}
+Coverage: {coverage_target}% lines
+flags: edge={edge},err={err}
+<code lang={language_tag}>
+{code}
+</code>
+"""
+
+INTEGRATION_TEST_INPUT = """Framework: {framework}
+flags: auth={auth}
+<api>
+{api_spec}
+</api>
+"""
+
+E2E_TEST_INPUT = """Framework: {framework}
+flags: pom={pom}
+<story>
+{user_story}
+</story>
+"""
+
+TEST_DATA_INPUT = """Samples: {num_samples}
+Data Type: {data_type}
+<schema>
+{schema}
+</schema>
+"""
+
+TEST_DATA_MULTI_INPUT = """Samples per Data Type: {num_samples}
+Data Types: {data_types}
+<schema>
+{schema}
+</schema>
+"""
+
+MISSING_TESTS_INPUT = """<source>
+{source_code}
+</source>
+<tests>
+{existing_tests}
+</tests>
+{coverage_section}"""
+
+# System messages, built once at import
+UNIT_TEST_SYSTEM_PROMPT = "\n\n".join([UNIT_TEST_ROLE, UNIT_TEST_PROMPT, END_INSTRUCTION])
+INTEGRATION_TEST_SYSTEM_PROMPT = "\n\n".join([INTEGRATION_TEST_ROLE, INTEGRATION_TEST_PROMPT, END_INSTRUCTION])
+E2E_TEST_SYSTEM_PROMPT = "\n\n".join([E2E_TEST_ROLE, E2E_TEST_PROMPT, END_INSTRUCTION])
+TEST_DATA_SYSTEM_PROMPTS = {
+    data_type: "\n\n".join([TEST_DATA_ROLE, TEST_DATA_PROMPT + rules]) for data_type, rules in TEST_DATA_RULES.items()
+}
+TEST_DATA_MULTI_SYSTEM_PROMPT = "\n\n".join([TEST_DATA_ROLE, TEST_DATA_MULTI_PROMPT])
+MISSING_TESTS_SYSTEM_PROMPT = "\n\n".join([MISSING_TESTS_ROLE, MISSING_TESTS_PROMPT, END_INSTRUCTION])
+
+# Opens every user message
+INPUT_HEADER = "INPUT:\n"
 
 
 class AITestGenerator:
     """
     AI-powered test generator using OpenAI API
 
+    All generate_* methods are coroutines, so independent generations can
+    run concurrently with asyncio.gather.
+
     Example usage:
         generator = AITestGenerator()
-        tests = generator.generate_unit_tests(
+        tests = await generator.generate_unit_tests(
             code=my_function_code,
             language="Python",
             framework=TestFramework.PYTEST
@@ -63,9 +385,330 @@ class AITestGenerator:
 
     def __init__(self, config: Optional[TestGenerationConfig] = None):
         self.config = config or TestGenerationConfig()
-        self.client = openai.OpenAI(api_key=self.config.openai_api_key)
+        # Set to use a specific client instead of the shared one
+        self._client: Optional[openai.AsyncOpenAI] = None
+        # Completion text by cache_key, so repeated generations skip the API
+        self._cache: Dict[str, str] = {}
+        # One semantic cache per prompt template, model and sampling settings
+        self._semantic_caches: Dict[str, SemanticCache] = {}
+        # Embedding by input text, least recently used first
+        self._embedding_cache: "OrderedDict[str, np.ndarray]" = OrderedDict()
+
+    def _chat_params(
+        self,
+        system: str,
+        prompt: str,
+        model: str,
+        max_tokens: Optional[int] = None,
+        temperature: Optional[float] = None,
+        **options
+    ) -> Dict:
+        """
+        Wrap a system message and user prompt in _complete parameters
+
+        max_tokens and temperature default to the config; options (stop,
+        response_format, semantic_input) are passed through.
+        """
+        return {
+            "model": model,
+            "messages": [
+                {"role": "system", "content": system},
+                {"role": "user", "content": prompt}
+            ],
+            "max_tokens": self.config.max_tokens if max_tokens is None else max_tokens,
+            "temperature": self.config.temperature if temperature is None else temperature,
+            **options
+        }
+
+    @property
+    def client(self) -> openai.AsyncOpenAI:
+        """
+        OpenAI client for the running event loop
+
+        Generators share one client (and its connection pool) per API key,
+        so creating many generators doesn't open new connections.
+        """
+        return self._client or shared_client(self.config.openai_api_key)
 
-    def generate_unit_tests(
+    @client.setter
+    def client(self, client: openai.AsyncOpenAI):
+        self._client = client
+
+    @property
+    def _semaphore(self) -> asyncio.Semaphore:
+        """Semaphore limiting this generator's completions on the running event loop"""
+        semaphores = _loop_state().semaphores
+        if self not in semaphores:
+            semaphores[self] = asyncio.Semaphore(self.config.max_concurrency)
+        return semaphores[self]
+
+    async def _complete(
+        self,
+        messages: List[Dict[str, str]],
+        model: str,
+        max_tokens: int,
+        temperature: float,
+        stop: Optional[List[str]] = None,
+        response_format: Optional[Dict[str, str]] = None,
+        semantic_input: Optional[str] = None
+    ) -> str:
+        """
+        Run a chat completion, serving repeated requests from the cache
+
+        With semantic_cache enabled, a request whose semantic_input is a near
+        duplicate of an earlier one reuses that earlier response, provided
+        the rest of the prompt and the settings are identical. Only the input
+        is embedded, so the shared prompt template can't inflate similarity.
+
+        Args:
+            messages: Chat messages to send
+            model: Model to use
+            max_tokens: Maximum tokens to generate
+            temperature: Sampling temperature
+            stop: Stop sequences ending the completion early
+            response_format: Response format, e.g. JSON_RESPONSE_FORMAT
+            semantic_input: The part of the user prompt that may match approximately
+
+        Returns:
+            Completion text
+
+        Raises:
+            ValueError: If a JSON response was cut off at max_tokens
+        """
+        cacheable = self.config.cache_responses and temperature <= self.config.cache_max_temperature
+        semantic = None
+        if cacheable:
+            key = cache_key(model, messages, temperature, max_tokens)
+            if key in self._cache:
+                return self._cache[key]
+
+            if self.config.semantic_cache and semantic_input:
+                template = [
+                    *messages[:-1],
+                    {**messages[-1], "content": messages[-1]["content"].replace(semantic_input, "")}
+                ]
+                template_key = cache_key(model, template, temperature, max_tokens)
+                semantic = self._semantic_caches.setdefault(
+                    template_key,
+                    SemanticCache(self.config.semantic_cache_threshold, self.config.semantic_cache_size)
+                )
+                embedding = await self._embed(semantic_input)
+                cached = semantic.lookup(embedding)
+                if cached is not None:
+                    return cached
+
+        async with self._semaphore:
+            response = await self._create_with_retry(
+                model=model,
+                messages=messages,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                stop=stop or openai.NOT_GIVEN,
+                response_format=response_format or openai.NOT_GIVEN
+            )
+        choice = response.choices[0]
+        if response_format and choice.finish_reason == "length":
+            raise ValueError(f"JSON response truncated at max_tokens={max_tokens}; request fewer samples")
+        content = choice.message.content
+
+        if cacheable:
+            self._cache[key] = content
+        if semantic is not None:
+            semantic.add(embedding, content)
+
+        return content
+
+    async def _complete_stream(
+        self,
+        messages: List[Dict[str, str]],
+        model: str,
+        max_tokens: int,
+        temperature: float,
+        stop: Optional[List[str]] = None,
+        response_format: Optional[Dict[str, str]] = None,
+        semantic_input: Optional[str] = None
+    ) -> AsyncIterator[str]:
+        """
+        Stream a chat completion token by token
+
+        A response already in the exact cache is yielded in one piece, and a
+        streamed response is cached once it's complete. The semantic cache
+        isn't consulted, since it would delay the first token by an
+        embeddings call.
+        """
+        cacheable = self.config.cache_responses and temperature <= self.config.cache_max_temperature
+        if cacheable:
+            key = cache_key(model, messages, temperature, max_tokens)
+            if key in self._cache:
+                yield self._cache[key]
+                return
+
+        parts = []
+        # The slot is held until the stream is consumed, since that's when
+        # the request is in flight
+        async with self._semaphore:
+            response = await self._create_with_retry(
+                model=model,
+                messages=messages,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                stop=stop or openai.NOT_GIVEN,
+                response_format=response_format or openai.NOT_GIVEN,
+                stream=True
+            )
+
+            try:
+                async for chunk in response:
+                    token = chunk.choices[0].delta.content if chunk.choices else None
+                    if token:
+                        parts.append(token)
+                        yield token
+            finally:
+                # Runs when the consumer stops early too, freeing the connection and the slot
+                await response.close()
+
+        if cacheable:
+            self._cache[key] = "".join(parts)
+
+    async def _create_with_retry(self, **params):
+        """
+        Call the chat completions API, retrying transient failures
+
+        Waits a random time up to RETRY_BASE_DELAY * 2^attempt (capped at
+        RETRY_MAX_DELAY) between attempts, so concurrent callers hitting
+        the same rate limit don't retry in lockstep.
+        """
+        for attempt in range(MAX_RETRY_ATTEMPTS):
+            try:
+                return await self.client.chat.completions.create(**params)
+            except RETRYABLE_ERRORS:
+                if attempt == MAX_RETRY_ATTEMPTS - 1:
+                    raise
+                await asyncio.sleep(random.uniform(0, min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** attempt)))
+
+    async def stream(self, task: str, **params) -> AsyncIterator[str]:
+        """
+        Stream a generation as it's produced
+
+        Example:
+            async for token in generator.stream("e2e_tests", user_story=story, framework=TestFramework.PLAYWRIGHT):
+                print(token, end="", flush=True)
+
+        Args:
+            task: Key of GENERATION_TASKS
+            **params: Keyword arguments of the matching generate_* method
+
+        Yields:
+            Chunks of the completion text
+        """
+        request = getattr(self, GENERATION_TASKS[task])(**params)
+        async with aclosing(self._complete_stream(**request)) as tokens:
+            async for token in tokens:
+                yield token
+
+    async def _embed(self, text: str) -> np.ndarray:
+        """
+        Embed a prompt for the semantic cache
+
+        Embeddings are memoized in memory and, with embedding_cache_path
+        set, on disk, so re-runs over the same inputs skip the API.
+        """
+        if text in self._embedding_cache:
+            self._embedding_cache.move_to_end(text)
+            return self._embedding_cache[text]
+
+        disk_key = hashlib.sha256(f"{self.config.embedding_model}:{text}".encode("utf-8")).hexdigest()
+        embedding = None
+        if self.config.embedding_cache_path:
+            with shelve.open(self.config.embedding_cache_path) as db:
+                embedding = db.get(disk_key)
+
+        if embedding is None:
+            response = await self.client.embeddings.create(model=self.config.embedding_model, input=text)
+            embedding = np.asarray(response.data[0].embedding, dtype=np.float32)
+            if self.config.embedding_cache_path:
+                with shelve.open(self.config.embedding_cache_path) as db:
+                    db[disk_key] = embedding
+
+        self._embedding_cache[text] = embedding
+        if len(self._embedding_cache) > self.config.embedding_cache_size:
+            self._embedding_cache.popitem(last=False)
+        return embedding
+
+    async def generate_batch(
+        self,
+        requests: List[Dict],
+        poll_interval: float = BATCH_POLL_INTERVAL
+    ) -> Dict[str, str]:
+        """
+        Run many generations as a single OpenAI Batch API job
+
+        Suited to offline runs: the job can take up to the 24h completion
+        window, in exchange for 50% lower cost and no synchronous rate limits.
+        Responses bypass the response caches.
+
+        Args:
+            requests: One dict per generation with "custom_id", "task" (a key
+                of GENERATION_TASKS) and "params" (keyword arguments of the
+                matching generate_* method)
+            poll_interval: Seconds between batch status checks
+
+        Returns:
+            Mapping of custom_id to completion text (failed requests are omitted)
+        """
+        lines = []
+        for request in requests:
+            builder = getattr(self, GENERATION_TASKS[request["task"]])
+            params = builder(**request.get("params", {}))
+            lines.append(json.dumps({
+                "custom_id": request["custom_id"],
+                "method": "POST",
+                "url": "/v1/chat/completions",
+                "body": {
+                    "model": params["model"],
+                    "messages": params["messages"],
+                    "temperature": params["temperature"],
+                    "max_tokens": params["max_tokens"],
+                    **{option: params[option] for option in ("stop", "response_format") if params.get(option)}
+                }
+            }))
+
+        batch_file = await self.client.files.create(
+            file=("test_generation_batch.jsonl", "\n".join(lines).encode("utf-8")),
+            purpose="batch"
+        )
+        batch = await self.client.batches.create(
+            input_file_id=batch_file.id,
+            endpoint="/v1/chat/completions",
+            completion_window="24h"
+        )
+
+        while batch.status not in BATCH_TERMINAL_STATUSES:
+            await asyncio.sleep(poll_interval)
+            batch = await self.client.batches.retrieve(batch.id)
+
+        if batch.status != "completed":
+            raise RuntimeError(f"Batch {batch.id} ended with status '{batch.status}'")
+
+        results = {}
+        if not batch.output_file_id:
+            return results
+
+        output = (await self.client.files.content(batch.output_file_id)).text
+        for line in output.splitlines():
+            if not line.strip():
+                continue
+
+            record = json.loads(line)
+            response = record.get("response") or {}
+            if record.get("error") or response.get("status_code") != 200:
+                continue
+
+            results[record["custom_id"]] = response["body"]["choices"][0]["message"]["content"]
+
+        return results
+
+    async def generate_unit_tests(
         self,
         code: str,
         language: str,
@@ -88,6 +731,20 @@ class AITestGenerator:
         Returns:
             Generated test code as string
         """
+        return await self._complete(**self._unit_test_request(
+            code, language, framework, include_edge_cases, include_error_handling, coverage_target
+        ))
+
+    def _unit_test_request(
+        self,
+        code: str,
+        language: str,
+        framework: TestFramework,
+        include_edge_cases: bool = True,
+        include_error_handling: bool = True,
+        coverage_target: int = 100
+    ) -> Dict:
+        """Build the _complete parameters for generate_unit_tests"""
         prompt = self._build_unit_test_prompt(
             code=code,
             language=language,
@@ -97,24 +754,14 @@ class AITestGenerator:
             coverage_target=coverage_target
         )
 
-        response = self.client.chat.completions.create(
-            model=self.config.model,
-            messages=[
-                {
-                    "role": "system",
-                    "content": "You are an expert software testing engineer. Generate comprehensive, production-ready tests."
-                },
-                {
-                    "role": "user",
-                    "content": prompt
-                }
-            ],
-            temperature=self.config.temperature,
-            max_tokens=self.config.max_tokens
+        return self._chat_params(
+            UNIT_TEST_SYSTEM_PROMPT,
+            prompt,
+            model=self.config.models["unit"],
+            stop=COMPLETION_STOP,
+            semantic_input=code
         )
 
-        return response.choices[0].message.content
-
     def _build_unit_test_prompt(
         self,
         code: str,
@@ -125,55 +772,17 @@ class AITestGenerator:
         coverage_target: int
     ) -> str:
         """Build comprehensive prompt for unit test generation"""
+        return INPUT_HEADER + UNIT_TEST_INPUT.format(
+            language=language,
+            framework=framework.value,
+            coverage_target=coverage_target,
+            edge=int(include_edge_cases),
+            err=int(include_error_handling),
+            language_tag=language.lower(),
+            code=code
+        )
 
-        prompt = f"""You are an expert QA engineer specializing in {language} and {framework.value}.
-
-Task: Generate comprehensive unit tests for the following code.
-
-Code to test:
-```{language.lower()}
-{code}
-```
-
-Requirements:
-1. Testing Framework: {framework.value}
-2. Coverage Goal: {coverage_target}% line coverage
-3. Test Types Required:
-   - Happy path scenarios (main functionality)"""
-
-        if include_edge_cases:
-            prompt += "\n   - Edge cases and boundary conditions"
-
-        if include_error_handling:
-            prompt += "\n   - Error handling (all exception paths)"
-
-        prompt += """
-   - Null/undefined/empty input handling
-   - Type validation (if applicable)
-
-4. Code Quality:
-   - Use descriptive test names that explain what is tested
-   - Follow AAA (Arrange, Act, Assert) pattern
-   - Add setup/teardown if needed
-   - Group related tests using describe/context blocks
-   - Add comments for complex assertions
-
-5. Test Data:
-   - Use realistic test data
-   - Avoid hardcoded magic numbers
-   - Extract test data to constants when reused
-
-6. Assertions:
-   - Use appropriate matchers/assertions
-   - Test both positive and negative cases
-   - Verify return values and side effects
-
-Output: Complete, runnable test file with all necessary imports.
-"""
-
-        return prompt
-
-    def generate_integration_tests(
+    async def generate_integration_tests(
         self,
         api_spec: str,
         framework: TestFramework,
@@ -190,44 +799,30 @@ Output: Complete, runnable test file with all necessary imports.
         Returns:
             Generated integration test code
         """
-        prompt = f"""You are an expert in integration testing.
-
-Task: Generate integration tests for the following API endpoint/component.
-
-API/Component Details:
-{api_spec}
+        return await self._complete(**self._integration_test_request(api_spec, framework, include_auth))
 
-Test Scenarios to Cover:
-1. Successful request/response
-2. Invalid input validation
-{"3. Authentication/Authorization" if include_auth else ""}
-4. Error handling (4xx, 5xx)
-5. Database interactions
-6. Response schema validation
-
-Requirements:
-- Framework: {framework.value}
-- Use appropriate HTTP client library
-- Include setup/teardown for test data
-- Verify status codes, response structure, headers
-- Test idempotency where applicable
-
-Output: Complete integration test suite with setup/teardown.
-"""
-
-        response = self.client.chat.completions.create(
-            model=self.config.model,
-            messages=[
-                {"role": "system", "content": "You are an integration testing expert."},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=self.config.temperature,
-            max_tokens=self.config.max_tokens
+    def _integration_test_request(
+        self,
+        api_spec: str,
+        framework: TestFramework,
+        include_auth: bool = True
+    ) -> Dict:
+        """Build the _complete parameters for generate_integration_tests"""
+        prompt = INPUT_HEADER + INTEGRATION_TEST_INPUT.format(
+            framework=framework.value,
+            auth=int(include_auth),
+            api_spec=api_spec
         )
 
-        return response.choices[0].message.content
+        return self._chat_params(
+            INTEGRATION_TEST_SYSTEM_PROMPT,
+            prompt,
+            model=self.config.models["integration"],
+            stop=COMPLETION_STOP,
+            semantic_input=api_spec
+        )
 
-    def generate_e2e_tests(
+    async def generate_e2e_tests(
         self,
         user_story: str,
         framework: TestFramework,
@@ -242,54 +837,40 @@ Output: Complete integration test suite with setup/teardown.
             use_page_objects: Use Page Object Model pattern
 
         Returns:
-            Dictionary with test file and page objects
+            Dictionary with "page_objects", "tests" and "fixtures" file
+            contents, plus the raw response as "combined"
         """
-        prompt = f"""You are an E2E testing expert using {framework.value}.
-
-User Story:
-{user_story}
-
-Task: Generate comprehensive E2E tests that validate this user story.
-
-Requirements:
-1. Framework: {framework.value}
-{"2. Pattern: Use Page Object Model" if use_page_objects else "2. Pattern: Direct selector approach"}
-3. Selectors: Prefer data-testid attributes
-4. Waits: Use explicit waits, no hard-coded sleeps
-5. Assertions: Check both UI state and API responses where applicable
-
-Test Scenarios:
-- Happy path (user completes flow successfully)
-- Alternative paths (user takes different route)
-- Error scenarios (invalid inputs, network errors)
-- Edge cases (boundary values, special characters)
-
-Output:
-{"1. Page Object classes for each page/component" if use_page_objects else ""}
-{"2. Test file with all scenarios" if use_page_objects else "1. Test file with all scenarios"}
-{"3. Fixture file with test data" if use_page_objects else "2. Fixture file with test data"}
-"""
+        content = await self._complete(**self._e2e_test_request(user_story, framework, use_page_objects))
+        return split_e2e_files(content)
 
-        response = self.client.chat.completions.create(
-            model=self.config.model,
-            messages=[
-                {"role": "system", "content": "You are an E2E testing specialist."},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=self.config.temperature,
-            max_tokens=3000  # E2E tests tend to be longer
+    def _e2e_test_request(
+        self,
+        user_story: str,
+        framework: TestFramework,
+        use_page_objects: bool = True
+    ) -> Dict:
+        """Build the _complete parameters for generate_e2e_tests"""
+        prompt = INPUT_HEADER + E2E_TEST_INPUT.format(
+            framework=framework.value,
+            pom=int(use_page_objects),
+            user_story=user_story
         )
 
-        # Parse response into separate files
-        content = response.choices[0].message.content
-        return {"combined": content}  # In production, parse into separate files
+        return self._chat_params(
+            E2E_TEST_SYSTEM_PROMPT,
+            prompt,
+            model=self.config.models["e2e"],
+            max_tokens=2 * self.config.max_tokens,  # Page objects, tests and fixtures
+            stop=COMPLETION_STOP,
+            semantic_input=user_story
+        )
 
-    def generate_test_data(
+    async def generate_test_data(
         self,
         schema: str,
         num_samples: int = 10,
         data_type: str = "valid"
-    ) -> str:
+    ) -> List[Dict]:
         """
         Generate realistic test data
 
@@ -299,58 +880,95 @@ Output:
             data_type: "valid", "invalid", or "edge_case"
 
         Returns:
-            Generated test data in JSON format
+            List of generated samples
+
+        Raises:
+            ValueError: If the response was truncated or has no "samples" array
         """
-        prompt = f"""You are a test data specialist.
+        content = await self._complete(**self._test_data_request(schema, num_samples, data_type))
+        samples = orjson.loads(content).get("samples")
+        if not isinstance(samples, list):
+            raise ValueError('Test data response has no "samples" array')
+        return samples
 
-Task: Generate realistic, diverse test data for the following schema.
+    def _test_data_request(
+        self,
+        schema: str,
+        num_samples: int = 10,
+        data_type: str = "valid"
+    ) -> Dict:
+        """Build the _complete parameters for generate_test_data"""
+        prompt = INPUT_HEADER + TEST_DATA_INPUT.format(
+            num_samples=num_samples,
+            data_type=data_type.upper(),
+            schema=schema
+        )
 
-Schema:
-{schema}
+        return self._chat_params(
+            TEST_DATA_SYSTEM_PROMPTS.get(data_type, TEST_DATA_SYSTEM_PROMPTS["edge_case"]),
+            prompt,
+            model=self.config.models["data"],
+            max_tokens=self._test_data_max_tokens(num_samples),
+            temperature=0.3,  # Slightly higher for diversity
+            response_format=JSON_RESPONSE_FORMAT,
+            semantic_input=schema
+        )
 
-Requirements:
-- Generate {num_samples} test data samples
-- Data Type: {data_type.upper()}
-- Format: Output as JSON array
+    def _test_data_max_tokens(self, num_samples: int) -> int:
+        """Completion budget for num_samples samples of one data type"""
+        return max(self.config.max_tokens, num_samples * TEST_DATA_TOKENS_PER_SAMPLE)
 
-"""
+    async def generate_test_data_multi(
+        self,
+        schema: str,
+        num_samples: int = 10,
+        types: Tuple[str, ...] = ("valid", "invalid", "edge_case")
+    ) -> Dict[str, List]:
+        """
+        Generate several kinds of test data with a single request
 
-        if data_type == "valid":
-            prompt += """For VALID data:
-- Follow all validation rules
-- Ensure referential integrity
-- Use realistic values (real names, valid emails, etc.)
-- Include diversity (different demographics, locales, formats)
-"""
-        elif data_type == "invalid":
-            prompt += """For INVALID data:
-- Violate specific validation rules systematically
-- Include boundary violations
-- Include type mismatches
-- Each sample should fail validation for a different reason
-"""
-        else:  # edge_case
-            prompt += """For EDGE CASE data:
-- Minimum/maximum values
-- Empty strings, nulls, undefined
-- Special characters, Unicode
-- Very long strings
-- Unusual but valid formats
-"""
+        Args:
+            schema: Data schema or interface definition
+            num_samples: Number of samples to generate per data type
+            types: Data types to generate ("valid", "invalid", "edge_case")
 
-        response = self.client.chat.completions.create(
-            model=self.config.model,
-            messages=[
-                {"role": "system", "content": "You are a test data generation expert."},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.3,  # Slightly higher for diversity
-            max_tokens=2000
+        Returns:
+            Mapping of data type to its list of samples
+
+        Raises:
+            ValueError: If the response was truncated or lacks a requested type's array
+        """
+        content = await self._complete(**self._test_data_multi_request(schema, num_samples, types))
+        data = orjson.loads(content)
+        missing = [data_type for data_type in types if not isinstance(data.get(data_type), list)]
+        if missing:
+            raise ValueError(f"Test data response has no array for: {', '.join(missing)}")
+        return {data_type: data[data_type] for data_type in types}
+
+    def _test_data_multi_request(
+        self,
+        schema: str,
+        num_samples: int = 10,
+        types: Tuple[str, ...] = ("valid", "invalid", "edge_case")
+    ) -> Dict:
+        """Build the _complete parameters for generate_test_data_multi"""
+        prompt = INPUT_HEADER + TEST_DATA_MULTI_INPUT.format(
+            num_samples=num_samples,
+            data_types=", ".join(types),
+            schema=schema
         )
 
-        return response.choices[0].message.content
+        return self._chat_params(
+            TEST_DATA_MULTI_SYSTEM_PROMPT,
+            prompt,
+            model=self.config.models["data"],
+            temperature=0.3,  # Slightly higher for diversity
+            max_tokens=len(types) * self._test_data_max_tokens(num_samples),
+            response_format=JSON_RESPONSE_FORMAT,
+            semantic_input=schema
+        )
 
-    def generate_missing_tests(
+    async def generate_missing_tests(
         self,
         source_code: str,
         existing_tests: str,
@@ -367,56 +985,32 @@ Requirements:
         Returns:
             Additional test cases to improve coverage
         """
-        prompt = f"""You are a QA analyst specializing in test coverage analysis.
-
-Task: Analyze the code and existing tests, then generate tests for uncovered code paths.
-
-Source Code:
-```
-{source_code}
-```
-
-Existing Tests:
-```
-{existing_tests}
-```
-
-{"Coverage Report:\n" + coverage_report if coverage_report else ""}
-
-Requirements:
-1. Analyze which code paths are not covered
-2. Generate tests specifically for uncovered lines
-3. Prioritize:
-   - Error handling paths
-   - Edge cases
-   - Conditional branches
-4. Match style of existing tests
-5. Do not duplicate existing test scenarios
-
-Output:
-- List of uncovered scenarios (bullet points)
-- New test cases to add to existing test file
-- Explanation of what each new test covers
-"""
+        return await self._complete(**self._missing_tests_request(source_code, existing_tests, coverage_report))
 
-        response = self.client.chat.completions.create(
-            model=self.config.model,
-            messages=[
-                {"role": "system", "content": "You are a test coverage expert."},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=self.config.temperature,
-            max_tokens=2000
+    def _missing_tests_request(
+        self,
+        source_code: str,
+        existing_tests: str,
+        coverage_report: Optional[str] = None
+    ) -> Dict:
+        """Build the _complete parameters for generate_missing_tests"""
+        prompt = INPUT_HEADER + MISSING_TESTS_INPUT.format(
+            source_code=source_code,
+            existing_tests=existing_tests,
+            coverage_section=f"<coverage>\n{coverage_report}\n</coverage>\n" if coverage_report else ""
         )
 
-        return response.choices[0].message.content
+        return self._chat_params(
+            MISSING_TESTS_SYSTEM_PROMPT,
+            prompt,
+            model=self.config.models["missing"],
+            stop=COMPLETION_STOP,
+            semantic_input=source_code
+        )
 
 
 # Example usage and demonstrations
-def example_unit_test_generation():
-    """Example: Generate unit tests for a Python function"""
-
-    source_code = """
+EXAMPLE_SOURCE_CODE = """
 def calculate_discount(price, discount_percent, member_tier="regular"):
     '''
     Calculate discounted price based on percentage and member tier
@@ -454,30 +1048,8 @@ def calculate_discount(price, discount_percent, member_tier="regular"):
     return round(final_price, 2)
 """
 
-    generator = AITestGenerator()
 
-    print("Generating unit tests...")
-    tests = generator.generate_unit_tests(
-        code=source_code,
-        language="Python",
-        framework=TestFramework.PYTEST,
-        include_edge_cases=True,
-        include_error_handling=True,
-        coverage_target=100
-    )
-
-    print("\n" + "=" * 80)
-    print("GENERATED TESTS:")
-    print("=" * 80)
-    print(tests)
-
-    return tests
-
-
-def example_api_integration_tests():
-    """Example: Generate integration tests for API"""
-
-    api_spec = """
+EXAMPLE_API_SPEC = """
 POST /api/users
 Creates a new user account
 
@@ -509,11 +1081,56 @@ Error Responses:
 - 500: Server error
 """
 
+
+EXAMPLE_SCHEMA = """
+interface User {
+  id: string;
+  email: string;
+  username: string;
+  age: number;
+  country: string;
+  created_at: Date;
+  is_active: boolean;
+}
+"""
+
+
+async def example_unit_test_generation():
+    """Example: Generate unit tests for a Python function"""
+
+    generator = AITestGenerator()
+
+    print("Generating unit tests...")
+    print("\n" + "=" * 80)
+    print("GENERATED TESTS:")
+    print("=" * 80)
+
+    # Print tokens as they arrive instead of waiting for the whole file
+    parts = []
+    async for token in generator.stream(
+        "unit_tests",
+        code=EXAMPLE_SOURCE_CODE,
+        language="Python",
+        framework=TestFramework.PYTEST,
+        include_edge_cases=True,
+        include_error_handling=True,
+        coverage_target=100
+    ):
+        parts.append(token)
+        print(token, end="", flush=True)
+    print()
+
+    return "".join(parts)
+
+
+async def example_api_integration_tests():
+    """Example: Generate integration tests for API"""
+
     generator = AITestGenerator()
 
     print("Generating integration tests...")
-    tests = generator.generate_integration_tests(
-        api_spec=api_spec,
+    tests = await generator.generate_integration_tests(
+        api_spec=EXAMPLE_API_SPEC,
         framework=TestFramework.PYTEST,
         include_auth=True
     )
@@ -526,59 +1143,91 @@ Error Responses:
     return tests
 
 
-def example_test_data_generation():
+async def example_test_data_generation():
     """Example: Generate test data"""
 
-    schema = """
-interface User {
-  id: string;
-  email: string;
-  username: string;
-  age: number;
-  country: string;
-  created_at: Date;
-  is_active: boolean;
-}
-"""
-
     generator = AITestGenerator()
 
-    print("Generating valid test data...")
-    valid_data = generator.generate_test_data(
-        schema=schema,
+    print("Generating valid and invalid test data...")
+    data = await generator.generate_test_data_multi(
+        schema=EXAMPLE_SCHEMA,
         num_samples=5,
-        data_type="valid"
+        types=("valid", "invalid")
     )
 
     print("\n" + "=" * 80)
     print("GENERATED TEST DATA (VALID):")
     print("=" * 80)
-    print(valid_data)
-
-    print("\n\nGenerating invalid test data...")
-    invalid_data = generator.generate_test_data(
-        schema=schema,
-        num_samples=5,
-        data_type="invalid"
-    )
+    print(orjson.dumps(data["valid"], option=orjson.OPT_INDENT_2).decode())
 
     print("\n" + "=" * 80)
     print("GENERATED TEST DATA (INVALID):")
     print("=" * 80)
-    print(invalid_data)
+    print(orjson.dumps(data["invalid"], option=orjson.OPT_INDENT_2).decode())
 
-    return valid_data, invalid_data
+    return data["valid"], data["invalid"]
 
 
-if __name__ == "__main__":
+async def example_batch_generation():
+    """Example: Run all of the above as one Batch API job (50% cheaper, up to 24h latency)"""
+
+    generator = AITestGenerator()
+
+    print("Submitting batch job...")
+    results = await generator.generate_batch([
+        {
+            "custom_id": "unit_tests",
+            "task": "unit_tests",
+            "params": {
+                "code": EXAMPLE_SOURCE_CODE,
+                "language": "Python",
+                "framework": TestFramework.PYTEST,
+                "coverage_target": 100
+            }
+        },
+        {
+            "custom_id": "integration_tests",
+            "task": "integration_tests",
+            "params": {"api_spec": EXAMPLE_API_SPEC, "framework": TestFramework.PYTEST}
+        },
+        {
+            "custom_id": "test_data",
+            "task": "test_data_multi",
+            "params": {"schema": EXAMPLE_SCHEMA, "num_samples": 5, "types": ("valid", "invalid")}
+        }
+    ])
+
+    for custom_id, content in results.items():
+        print("\n" + "=" * 80)
+        print(f"GENERATED {custom_id.upper()}:")
+        print("=" * 80)
+        print(content)
+
+    return results
+
+
+async def main(batch: bool = False):
+    """
+    Run all examples
+
+    The unit test example streams to stdout, so it runs on its own first;
+    the others then run concurrently, each printing its results as they
+    arrive. With batch=True the same generations are submitted as one
+    Batch API job instead, for offline runs where cost matters more than
+    latency.
+    """
     print("AI Test Generator Examples\n")
 
-    # Run examples
-    print("\n\n### EXAMPLE 1: Unit Test Generation ###\n")
-    example_unit_test_generation()
+    if batch:
+        await example_batch_generation()
+        return
+
+    await example_unit_test_generation()
+    await asyncio.gather(
+        example_api_integration_tests(),
+        example_test_data_generation()
+    )
 
-    print("\n\n### EXAMPLE 2: Integration Test Generation ###\n")
-    example_api_integration_tests()
 
-    print("\n\n### EXAMPLE 3: Test Data Generation ###\n")
-    example_test_data_generation()
+if __name__ == "__main__":
+    asyncio.run(main(batch="--batch" in sys.argv[1:]))